@@ -1,19 +1,27 @@
+import hashlib
 import os
-from datetime import datetime, timedelta
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
 
 import bcrypt
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.user import User
+from app.models.refresh_token import RefreshToken
+from app.core.presence import presence
+from app.core.statements import get_user
 
 # ───── 🔐 CONFIG ──────────────────────────────────────────────
 SECRET_KEY = os.getenv("SECRET_KEY", "DEV_SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 30))
 
 # This token URL is used by FastAPI's OAuth2PasswordBearer
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -28,6 +36,79 @@ def create_access_token(data: dict) -> str:
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# ───── ♻️ REFRESH TOKENS ──────────────────────────────────────
+def _hash_refresh_token(token: str) -> str:
+    # Tokens are 256 random bits, so a fast unsalted hash is enough (and keeps lookup cheap)
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: str = None) -> str:
+    """Create a refresh token for the user (caller commits). Returns the raw token."""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_refresh_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def _revoke_family(db: Session, family_id: str):
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({"revoked_at": datetime.now(timezone.utc)}, synchronize_session=False)
+
+
+def rotate_refresh_token(db: Session, token: str):
+    """
+    Exchange a refresh token for a new one in the same family. Presenting a token
+    that was already rotated means it leaked, so the whole family is revoked.
+    Returns (user_id, new raw refresh token).
+
+    The old token is revoked with a conditional UPDATE, so of two concurrent
+    refreshes of the same token only one gets a new token; the other counts as reuse.
+    """
+    invalid = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired refresh token")
+    reuse = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token reuse detected")
+    stored = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_refresh_token(token)).first()
+    if stored is None:
+        raise invalid
+    if stored.revoked_at is not None:
+        _revoke_family(db, stored.family_id)
+        db.commit()
+        raise reuse
+    expires_at = stored.expires_at if stored.expires_at.tzinfo else stored.expires_at.replace(tzinfo=timezone.utc)
+    if expires_at < datetime.now(timezone.utc):
+        raise invalid
+    user = get_user(db, stored.user_id)
+    if user is None or user.is_active is False:
+        raise invalid
+    revoked = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if revoked != 1:
+        # Another request rotated this token since we read it
+        _revoke_family(db, stored.family_id)
+        db.commit()
+        raise reuse
+    new_token = issue_refresh_token(db, stored.user_id, stored.family_id)
+    db.commit()
+    return stored.user_id, new_token
+
+
+def revoke_refresh_token(db: Session, token: str):
+    """Revoke the token's whole family (logout). Unknown tokens are ignored."""
+    stored = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_refresh_token(token)).first()
+    if stored is not None:
+        _revoke_family(db, stored.family_id)
+        db.commit()
+
+
 # ───── 🔐 TOKEN VALIDATION ────────────────────────────────────
 def decode_access_token(token: str):
     """Decode and validate a JWT access token."""
@@ -39,8 +120,8 @@ def decode_access_token(token: str):
 
 
 # ───── 🔎 GET CURRENT USER ─────────────────────────────────────
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Extract user from token (used for protected routes)."""
+def token_user_id(token: str) -> int:
+    """User id (token subject) of a valid access token; no database lookup."""
     payload = decode_access_token(token)
     if payload is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
@@ -48,14 +129,41 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token payload missing")
+    return int(user_id)
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+
+def _load_token_user(token: str, db: Session) -> User:
+    user = get_user(db, token_user_id(token))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if user.is_active is False:
+        # Account is pending deletion (see routers/user.py)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Account is deactivated")
 
+    # Any authenticated request counts as activity for the presence registry
+    presence.touch(user.id)
     return user
 
 
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    """Extract user from token (used for protected routes)."""
+    return _load_token_user(token, db)
+
+
+def get_current_user_readonly(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)) -> User:
+    """Same as get_current_user, but loaded through the read (replica) session."""
+    return _load_token_user(token, db)
+
+
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """
+    Id of the authenticated user, without loading the account. Unlike get_current_user this
+    also accepts deactivated (or already deleted) accounts: use it only for endpoints that
+    check ownership themselves, such as the status of an account-deletion job.
+    """
+    return token_user_id(token)
+
+
 # ───── 🔒 PASSWORD UTILS ───────────────────────────────────────
 def hash_password(password: str) -> str:
     """Hash a plaintext password using bcrypt."""
@@ -0,0 +1,326 @@
+# app/core/bulk_import.py
+"""
+Bulk import of users, game profiles and friend edges for community migrations.
+
+Input is JSONL, one record per line, tagged with "type":
+    {"type": "user", "username": ..., "email": ..., "password": ... | "hashed_password": "$2b$...", ...profile fields}
+    {"type": "game_profile", "username": ..., "game_type": ..., "playstyle": ..., ...}
+    {"type": "friend", "from_username": ..., "to_username": ..., "status": "accepted"}
+or CSV with one user per row (username,email,password|hashed_password,platform,region,games)
+where games are separated by ";".
+
+Records are processed in batches of IMPORT_BATCH_SIZE: plaintext passwords are hashed
+in a process pool, users are inserted with ON CONFLICT DO NOTHING, and every bad row
+is reported instead of aborting the import. Users must appear before the profiles and
+friend edges that reference them (at the latest in the same batch).
+
+CLI: python -m app.core.bulk_import FILE [--format jsonl|csv]
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import bcrypt
+from pydantic import BaseModel, EmailStr, ValidationError
+from sqlalchemy import insert as generic_insert, tuple_
+from sqlalchemy.orm import Session
+
+from app.db.functions import insert_ignore
+from app.models.friend import FriendRequest, Friendship
+from app.models.game_profile import GameProfile
+from app.models.user import User
+
+# ───── ⚙️ CONFIG ──────────────────────────────────────────────
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 2000))
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", os.cpu_count() or 1))
+MAX_REPORTED_ERRORS = 1000
+
+
+# ───── 📄 RECORD SCHEMAS ──────────────────────────────────────
+class ImportUser(BaseModel):
+    username: str
+    email: EmailStr
+    password: Optional[str] = None
+    hashed_password: Optional[str] = None
+    platform: Optional[str] = None
+    region: Optional[str] = None
+    games: Optional[List[str]] = None
+    quiz_answers: Optional[dict] = None
+    overwatch_role: Optional[str] = None
+    is_private: Optional[bool] = False
+
+class ImportGameProfile(BaseModel):
+    username: str
+    game_type: str
+    playstyle: str
+    communication_preference: str
+    role_preference: str
+    rank: Optional[str] = None
+    additional_preferences: Optional[dict] = None
+
+class ImportFriend(BaseModel):
+    from_username: str
+    to_username: str
+    status: str = "accepted"
+
+RECORD_TYPES = {"user": ImportUser, "game_profile": ImportGameProfile, "friend": ImportFriend}
+
+
+class ImportReport:
+    def __init__(self):
+        self.users_created = 0
+        self.game_profiles_created = 0
+        self.friend_requests_created = 0
+        self.rows_read = 0
+        self.error_count = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows_read": self.rows_read,
+            "users_created": self.users_created,
+            "game_profiles_created": self.game_profiles_created,
+            "friend_requests_created": self.friend_requests_created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows_read / elapsed, 1) if elapsed else None,
+        }
+
+
+# ───── 📥 PARSING ─────────────────────────────────────────────
+def read_jsonl(lines: Iterable[str]) -> Iterator[Tuple[int, Optional[str], dict]]:
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, None, {"_error": f"Invalid JSON: {exc.msg}"}
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, {"_error": "Record must be a JSON object"}
+            continue
+        yield line_no, record.pop("type", "user"), record
+
+def read_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Optional[str], dict]]:
+    for line_no, row in enumerate(csv.DictReader(lines), start=2):
+        record = {key: value for key, value in row.items() if value not in (None, "")}
+        if "games" in record:
+            record["games"] = [game.strip() for game in record["games"].split(";") if game.strip()]
+        yield line_no, "user", record
+
+
+# ───── 🔒 PASSWORD HASHING ────────────────────────────────────
+def _hash_pool() -> ProcessPoolExecutor:
+    # Spawned, not forked: inside /admin/import the parent is a multi-threaded API worker,
+    # and a fork can leave the child stuck on a lock some other thread held at the time
+    return ProcessPoolExecutor(max_workers=IMPORT_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _hash_passwords(pool: ProcessPoolExecutor, passwords: List[str]) -> List[str]:
+    """Same hashes as auth.hash_password. bcrypt.hashpw is sent to the workers by reference,
+    so spawned workers only import bcrypt, not the app."""
+    salts = [bcrypt.gensalt() for _ in passwords]
+    chunksize = max(1, len(passwords) // (IMPORT_HASH_WORKERS * 4))
+    hashed = pool.map(bcrypt.hashpw, [password.encode("utf-8") for password in passwords], salts, chunksize=chunksize)
+    return [value.decode("utf-8") for value in hashed]
+
+
+# ───── 🧱 BATCH FLUSHING ──────────────────────────────────────
+class BulkImporter:
+    def __init__(self, db: Session, pool: ProcessPoolExecutor, report: ImportReport):
+        self.db = db
+        self.pool = pool
+        self.report = report
+        self.users = []     # (line, ImportUser)
+        self.profiles = []  # (line, ImportGameProfile)
+        self.friends = []   # (line, ImportFriend)
+
+    def add(self, line: int, record_type: Optional[str], record: dict):
+        self.report.rows_read += 1
+        if "_error" in record:
+            self.report.error(line, record["_error"])
+            return
+        schema = RECORD_TYPES.get(record_type)
+        if schema is None:
+            self.report.error(line, f"Unknown record type '{record_type}'")
+            return
+        try:
+            item = schema(**record)
+        except ValidationError as exc:
+            self.report.error(line, "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()))
+            return
+        if schema is ImportUser:
+            if not item.hashed_password and not item.password:
+                self.report.error(line, "password or hashed_password is required")
+                return
+            if item.hashed_password and not item.hashed_password.startswith(("$2a$", "$2b$", "$2y$")):
+                self.report.error(line, "hashed_password must be a bcrypt hash")
+                return
+            self.users.append((line, item))
+        elif schema is ImportGameProfile:
+            self.profiles.append((line, item))
+        else:
+            self.friends.append((line, item))
+        if len(self.users) + len(self.profiles) + len(self.friends) >= IMPORT_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        self._flush_users()
+        self._flush_profiles()
+        self._flush_friends()
+        self.db.commit()
+
+    def _flush_users(self):
+        if not self.users:
+            return
+        # Drop duplicates within the batch before touching the database
+        seen_usernames, seen_emails, batch = set(), set(), []
+        for line, user in self.users:
+            if user.username in seen_usernames or user.email in seen_emails:
+                self.report.error(line, "Duplicate username or email within import")
+                continue
+            seen_usernames.add(user.username)
+            seen_emails.add(user.email)
+            batch.append((line, user))
+        self.users = []
+
+        plaintext = [user.password for _, user in batch if not user.hashed_password]
+        hashes = iter(_hash_passwords(self.pool, plaintext))
+        rows = []
+        for _, user in batch:
+            values = user.dict(exclude={"password"})
+            values["hashed_password"] = user.hashed_password or next(hashes)
+            rows.append(values)
+
+        inserted = {
+            username for (username,) in self.db.execute(insert_ignore(self.db, User).returning(User.username), rows)
+        }
+        self.report.users_created += len(inserted)
+        for line, user in batch:
+            if user.username not in inserted:
+                self.report.error(line, "Username or email already registered")
+
+    def _user_ids(self, usernames: set) -> dict:
+        if not usernames:
+            return {}
+        return dict(self.db.query(User.username, User.id).filter(User.username.in_(usernames)).all())
+
+    def _flush_profiles(self):
+        if not self.profiles:
+            return
+        ids = self._user_ids({profile.username for _, profile in self.profiles})
+        keys = {(ids[p.username], p.game_type) for _, p in self.profiles if p.username in ids}
+        existing = set(
+            self.db.query(GameProfile.user_id, GameProfile.game_type)
+            .filter(tuple_(GameProfile.user_id, GameProfile.game_type).in_(keys)).all()
+        ) if keys else set()
+        rows = []
+        for line, profile in self.profiles:
+            user_id = ids.get(profile.username)
+            if user_id is None:
+                self.report.error(line, f"Unknown user '{profile.username}'")
+            elif (user_id, profile.game_type) in existing:
+                self.report.error(line, f"Game profile '{profile.game_type}' already exists for '{profile.username}'")
+            else:
+                existing.add((user_id, profile.game_type))
+                rows.append({"user_id": user_id, **profile.dict(exclude={"username"})})
+        self.profiles = []
+        if rows:
+            self.db.execute(generic_insert(GameProfile), rows)
+            self.report.game_profiles_created += len(rows)
+
+    def _flush_friends(self):
+        if not self.friends:
+            return
+        ids = self._user_ids({f.from_username for _, f in self.friends} | {f.to_username for _, f in self.friends})
+        edges = []
+        for line, friend in self.friends:
+            from_id, to_id = ids.get(friend.from_username), ids.get(friend.to_username)
+            if from_id is None or to_id is None:
+                self.report.error(line, "Unknown user in friend edge")
+            elif from_id == to_id:
+                self.report.error(line, "Friend edge must connect two different users")
+            elif friend.status not in ("pending", "accepted"):
+                self.report.error(line, "status must be 'pending' or 'accepted'")
+            else:
+                edges.append((line, from_id, to_id, friend.status))
+        self.friends = []
+        if not edges:
+            return
+        # At most one request per pair of users, in either direction (as send_friend_request enforces)
+        keys = {(a, b) for _, a, b, _ in edges} | {(b, a) for _, a, b, _ in edges}
+        taken = set(
+            self.db.query(FriendRequest.from_user_id, FriendRequest.to_user_id)
+            .filter(tuple_(FriendRequest.from_user_id, FriendRequest.to_user_id).in_(keys)).all()
+        )
+        taken |= {(b, a) for a, b in taken}
+        rows, row_lines = [], {}
+        for line, from_id, to_id, status in edges:
+            if (from_id, to_id) in taken:
+                self.report.error(line, "Friend request already exists between these users")
+                continue
+            taken |= {(from_id, to_id), (to_id, from_id)}
+            row_lines[(from_id, to_id)] = line
+            rows.append({"from_user_id": from_id, "to_user_id": to_id, "status": status})
+        if not rows:
+            return
+        inserted = self.db.execute(
+            insert_ignore(self.db, FriendRequest)
+            .returning(FriendRequest.from_user_id, FriendRequest.to_user_id, FriendRequest.status), rows
+        ).all()
+        self.report.friend_requests_created += len(inserted)
+        for from_id, to_id, _ in inserted:
+            row_lines.pop((from_id, to_id), None)
+        for line in row_lines.values():  # lost a race with a concurrent request
+            self.report.error(line, "Friend request already exists between these users")
+        # Accepted edges are also materialized in both directions, only for requests actually inserted
+        friendships = [pair for from_id, to_id, status in inserted if status == "accepted"
+                       for pair in Friendship.pair(from_id, to_id)]
+        if friendships:
+            self.db.execute(insert_ignore(self.db, Friendship), friendships)
+
+
+def import_records(db: Session, records: Iterable[Tuple[int, Optional[str], dict]]) -> dict:
+    """Import parsed records and return a report (counts plus per-row errors)."""
+    report = ImportReport()
+    with _hash_pool() as pool:
+        importer = BulkImporter(db, pool, report)
+        for line, record_type, record in records:
+            importer.add(line, record_type, record)
+        importer.flush()
+    return report.as_dict()
+
+
+def import_file(db: Session, lines: Iterable[str], fmt: str) -> dict:
+    return import_records(db, read_csv(lines) if fmt == "csv" else read_jsonl(lines))
+
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Bulk import users, game profiles and friend edges")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None)
+    args = parser.parse_args()
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "jsonl")
+    session = SessionLocal()
+    try:
+        with open(args.path, newline="", encoding="utf-8") as fh:
+            summary = import_file(session, fh, fmt)
+    finally:
+        session.close()
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,48 @@
+# app/core/etag.py
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag built from cheap version data (ids, counters, timestamps)."""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_headers(etag: str, vary: Optional[str] = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if vary:
+        headers["Vary"] = vary
+    return headers
+
+
+def not_modified(request: Request, response: Response, etag: str, vary: Optional[str] = None) -> Optional[Response]:
+    """
+    Attach ``etag`` to the outgoing response and return a 304 response if the client's
+    If-None-Match already matches it (weak comparison); otherwise return None.
+    Pass ``vary`` (e.g. "Accept") when the same URL has several representations.
+    """
+    headers = etag_headers(etag, vary)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in candidates or etag.removeprefix("W/") in candidates:
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def user_etag(user: User, resource: str) -> str:
+    return make_etag(resource, user.id, user.version)
+
+
+def bump_user_versions(db: Session, *user_ids: int):
+    """Invalidate the ETags derived from these users' versions (caller commits)."""
+    db.query(User).filter(User.id.in_(user_ids)).update(
+        {User.version: User.version + 1}, synchronize_session=False
+    )
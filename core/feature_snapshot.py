@@ -0,0 +1,356 @@
+# app/core/feature_snapshot.py
+"""
+Compact, memory-mapped snapshot of the scoring-relevant User fields.
+
+One writer process (``python -m app.core.feature_snapshot``) refreshes the file;
+every uvicorn/gunicorn worker maps it read-only, so the pages are shared by the
+OS page cache instead of being rebuilt from Postgres in each process.
+
+File layout (little-endian, every section 8-byte aligned):
+    header   MAGIC | version u64 | generated_at f64 | watermark f64 | n_users u64
+    table    (offset u64, length u64) for each entry in SECTIONS
+    sections ids i64[n], platform/region/overwatch_role/feedback_score i32[n],
+             is_private i8[n], games/quiz CSR offsets i32[n+1] + values i32[...],
+             vocab (UTF-8 JSON list shared by every encoded string)
+"""
+import argparse
+import bisect
+import fcntl
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+# ───── ⚙️ CONFIG ──────────────────────────────────────────────
+SNAPSHOT_PATH = os.getenv("FEATURE_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "tomolink-features.snap"))
+SNAPSHOT_REFRESH_SECONDS = float(os.getenv("FEATURE_SNAPSHOT_REFRESH_SECONDS", 30))
+# How often a worker re-stats the file to pick up a newer version
+SNAPSHOT_RECHECK_SECONDS = float(os.getenv("FEATURE_SNAPSHOT_RECHECK_SECONDS", 5))
+# updated_at is taken when the writing transaction starts, so a row can become visible
+# after a later watermark was recorded: every refresh re-reads this much history
+SNAPSHOT_WATERMARK_OVERLAP_SECONDS = float(os.getenv("FEATURE_SNAPSHOT_WATERMARK_OVERLAP_SECONDS", 300))
+
+MAGIC = b"TMLKFS01"
+HEADER = struct.Struct("<8sQddQ")
+SECTIONS = [
+    ("ids", "q"),
+    ("platform", "i"),
+    ("region", "i"),
+    ("overwatch_role", "i"),
+    ("feedback_score", "i"),
+    ("is_private", "b"),
+    ("games_offsets", "i"),
+    ("games_values", "i"),
+    ("quiz_offsets", "i"),
+    ("quiz_values", "i"),
+    ("vocab", "B"),
+]
+SECTION_ENTRY = struct.Struct("<QQ")
+NONE_CODE = -1
+
+# Columns the snapshot is built from (no password hashes, emails, etc.)
+FEATURE_COLUMNS = (
+    User.id, User.platform, User.region, User.overwatch_role, User.feedback_score,
+    User.is_private, User.games, User.quiz_answers, User.updated_at,
+)
+
+
+# ───── 👤 DECODED ROW VIEW ────────────────────────────────────
+class UserFeatures:
+    """Duck-typed stand-in for ``User`` accepted by the compute_compatibility helpers.
+
+    ``username`` is not stored in the snapshot; candidate_features fills it in.
+    """
+    __slots__ = ("id", "platform", "region", "overwatch_role", "feedback_score",
+                 "is_private", "games", "quiz_answers", "username")
+
+    def __init__(self, id, platform, region, overwatch_role, feedback_score, is_private, games, quiz_answers,
+                 username=None):
+        self.id = id
+        self.platform = platform
+        self.region = region
+        self.overwatch_role = overwatch_role
+        self.feedback_score = feedback_score
+        self.is_private = is_private
+        self.games = games
+        self.quiz_answers = quiz_answers
+        self.username = username
+
+
+# ───── 📖 READER ──────────────────────────────────────────────
+class FeatureSnapshot:
+    """Read-only view over a mapped snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            stat = os.fstat(fh.fileno())
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.inode = (stat.st_ino, stat.st_mtime_ns)
+        magic, self.version, self.generated_at, self.watermark, self.size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a feature snapshot")
+        view = memoryview(self._mmap)
+        columns = {}
+        for idx, (name, fmt) in enumerate(SECTIONS):
+            offset, length = SECTION_ENTRY.unpack_from(self._mmap, HEADER.size + idx * SECTION_ENTRY.size)
+            columns[name] = view[offset:offset + length].cast(fmt)
+        self.ids = columns["ids"]
+        self.platform = columns["platform"]
+        self.region = columns["region"]
+        self.overwatch_role = columns["overwatch_role"]
+        self.feedback_score = columns["feedback_score"]
+        self.is_private = columns["is_private"]
+        self.games_offsets = columns["games_offsets"]
+        self.games_values = columns["games_values"]
+        self.quiz_offsets = columns["quiz_offsets"]
+        self.quiz_values = columns["quiz_values"]
+        self.vocab = json.loads(bytes(columns["vocab"]).decode("utf-8"))
+        self.codes = {value: code for code, value in enumerate(self.vocab)}
+
+    def __len__(self):
+        return self.size
+
+    def index_of(self, user_id: int) -> Optional[int]:
+        """Position of ``user_id`` in the (sorted) id column, or None."""
+        pos = bisect.bisect_left(self.ids, user_id)
+        if pos < self.size and self.ids[pos] == user_id:
+            return pos
+        return None
+
+    def encode(self, value: str) -> int:
+        return self.codes.get(value, NONE_CODE)
+
+    def _decode(self, code: int) -> Optional[str]:
+        return None if code == NONE_CODE else self.vocab[code]
+
+    def game_codes(self, idx: int):
+        return self.games_values[self.games_offsets[idx]:self.games_offsets[idx + 1]]
+
+    def quiz_codes(self, idx: int):
+        return self.quiz_values[self.quiz_offsets[idx]:self.quiz_offsets[idx + 1]]
+
+    def row(self, idx: int) -> UserFeatures:
+        quiz = {}
+        for code in self.quiz_codes(idx):
+            key, value = json.loads(self.vocab[code])
+            quiz[key] = value
+        return UserFeatures(
+            id=self.ids[idx],
+            platform=self._decode(self.platform[idx]),
+            region=self._decode(self.region[idx]),
+            overwatch_role=self._decode(self.overwatch_role[idx]),
+            feedback_score=self.feedback_score[idx],
+            is_private=bool(self.is_private[idx]),
+            games=[self.vocab[code] for code in self.game_codes(idx)],
+            quiz_answers=quiz or None,
+        )
+
+    def get(self, user_id: int) -> Optional[UserFeatures]:
+        idx = self.index_of(user_id)
+        return None if idx is None else self.row(idx)
+
+    def rows(self):
+        for idx in range(self.size):
+            yield self.row(idx)
+
+
+_current: Optional[FeatureSnapshot] = None
+_last_check = 0.0
+
+
+def get_snapshot(path: str = SNAPSHOT_PATH) -> Optional[FeatureSnapshot]:
+    """
+    Return the mapped snapshot for this worker, remapping when the writer has
+    swapped in a new version. Returns None if no snapshot has been written yet.
+    """
+    global _current, _last_check
+    now = time.monotonic()
+    if _current is not None and now - _last_check < SNAPSHOT_RECHECK_SECONDS:
+        return _current
+    _last_check = now
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return _current
+    if _current is None or _current.inode != (stat.st_ino, stat.st_mtime_ns):
+        _current = FeatureSnapshot(path)
+    return _current
+
+
+def candidate_features(db: Session, query) -> list:
+    """
+    Resolve a ``db.query(User)`` candidate query to UserFeatures for scoring.
+
+    With a snapshot mapped, the database only returns (id, username) for the rows the
+    query's filters match and the scoring fields are read from the snapshot (up to one
+    refresh interval old). Users the snapshot has not seen yet, or every user when no
+    snapshot has been written, are loaded from the database.
+    """
+    snapshot = get_snapshot(SNAPSHOT_PATH)
+    if snapshot is None:
+        return [_to_features(user) for user in query]
+    features, missing = [], []
+    for user_id, username in query.with_entities(User.id, User.username):
+        user = snapshot.get(user_id)
+        if user is None:
+            missing.append(user_id)
+        else:
+            user.username = username
+            features.append(user)
+    if missing:
+        features.extend(_to_features(row) for row in db.query(*FEATURE_COLUMNS, User.username).filter(User.id.in_(missing)))
+    return features
+
+
+# ───── ✍️ WRITER ──────────────────────────────────────────────
+def _to_features(row) -> UserFeatures:
+    return UserFeatures(
+        id=row.id, platform=row.platform, region=row.region, overwatch_role=row.overwatch_role,
+        feedback_score=row.feedback_score or 0, is_private=bool(row.is_private),
+        games=list(row.games or []), quiz_answers=row.quiz_answers, username=getattr(row, "username", None),
+    )
+
+
+def write_snapshot(path: str, users: list, version: int, watermark: float) -> None:
+    """Encode ``users`` (UserFeatures) and atomically replace the file at ``path``."""
+    users = sorted(users, key=lambda u: u.id)
+    vocab, codes = [], {}
+
+    def encode(value):
+        if value is None:
+            return NONE_CODE
+        if value not in codes:
+            codes[value] = len(vocab)
+            vocab.append(value)
+        return codes[value]
+
+    columns = {name: array(fmt) for name, fmt in SECTIONS if name != "vocab"}
+    columns["games_offsets"].append(0)
+    columns["quiz_offsets"].append(0)
+    for user in users:
+        columns["ids"].append(user.id)
+        columns["platform"].append(encode(user.platform))
+        columns["region"].append(encode(user.region))
+        columns["overwatch_role"].append(encode(user.overwatch_role))
+        columns["feedback_score"].append(int(user.feedback_score or 0))
+        columns["is_private"].append(1 if user.is_private else 0)
+        for game in dict.fromkeys(user.games or []):
+            columns["games_values"].append(encode(game))
+        columns["games_offsets"].append(len(columns["games_values"]))
+        for key, value in (user.quiz_answers or {}).items():
+            columns["quiz_values"].append(encode(json.dumps([key, value], sort_keys=True)))
+        columns["quiz_offsets"].append(len(columns["quiz_values"]))
+
+    payloads = [columns[name].tobytes() if name != "vocab" else json.dumps(vocab).encode("utf-8")
+                for name, _ in SECTIONS]
+    offset = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+    table, padded = [], []
+    for payload in payloads:
+        offset += -offset % 8
+        table.append((offset, len(payload)))
+        padded.append(payload)
+        offset += len(payload)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".features-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(HEADER.pack(MAGIC, version, time.time(), watermark, len(users)))
+            for entry in table:
+                fh.write(SECTION_ENTRY.pack(*entry))
+            for (section_offset, _), payload in zip(table, padded):
+                fh.write(b"\0" * (section_offset - fh.tell()))
+                fh.write(payload)
+            fh.flush()
+            os.fsync(fh.fileno())
+        # Readers that still map the old inode keep a consistent view until they remap
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def refresh_snapshot(db: Session, path: str = SNAPSHOT_PATH) -> int:
+    """
+    Bring the snapshot up to date and return its new version.
+
+    Only users whose ``updated_at`` is at or after the previous watermark minus
+    SNAPSHOT_WATERMARK_OVERLAP_SECONDS (plus any ids the snapshot has never seen)
+    are re-read; re-reading a row twice is harmless. Deleted users are dropped by
+    diffing against the live id set, which is an index-only scan.
+    """
+    previous = FeatureSnapshot(path) if os.path.exists(path) else None
+    live_ids = {user_id for (user_id,) in db.query(User.id)}
+
+    if previous is None:
+        changed_rows = db.query(*FEATURE_COLUMNS).all()
+        users = {}
+    else:
+        since = datetime.fromtimestamp(previous.watermark - SNAPSHOT_WATERMARK_OVERLAP_SECONDS, tz=timezone.utc)
+        changed_rows = db.query(*FEATURE_COLUMNS).filter(User.updated_at >= since).all()
+        users = {user.id: user for user in previous.rows() if user.id in live_ids}
+
+    watermark = previous.watermark if previous else 0.0
+    for row in changed_rows:
+        users[row.id] = _to_features(row)
+        if row.updated_at is not None:
+            # SQLite hands back naive datetimes; they are stored in UTC
+            updated_at = row.updated_at if row.updated_at.tzinfo else row.updated_at.replace(tzinfo=timezone.utc)
+            watermark = max(watermark, updated_at.timestamp())
+
+    missing = live_ids - users.keys()
+    if missing:
+        for row in db.query(*FEATURE_COLUMNS).filter(User.id.in_(missing)):
+            users[row.id] = _to_features(row)
+
+    version = (previous.version + 1) if previous else 1
+    write_snapshot(path, list(users.values()), version, watermark)
+    return version
+
+
+def run_writer(path: str = SNAPSHOT_PATH, interval: float = SNAPSHOT_REFRESH_SECONDS, once: bool = False):
+    """
+    Refresh loop; an exclusive flock guarantees a single writer per snapshot file.
+    A failed refresh is logged and retried on the next cycle.
+    """
+    from app.db.database import ReadSessionLocal
+
+    lock = open(path + ".lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print(f"⚠️ Another writer already owns {path}")
+        return
+    while True:
+        db = ReadSessionLocal()
+        try:
+            version = refresh_snapshot(db, path)
+            print(f"✅ Feature snapshot v{version} written to {path}")
+        except Exception as exc:
+            print("❌ Feature snapshot refresh failed:", repr(exc))
+            if once:
+                raise
+        finally:
+            db.close()
+        if once:
+            return
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the shared user feature snapshot")
+    parser.add_argument("--path", default=SNAPSHOT_PATH)
+    parser.add_argument("--interval", type=float, default=SNAPSHOT_REFRESH_SECONDS)
+    parser.add_argument("--once", action="store_true")
+    args = parser.parse_args()
+    run_writer(args.path, args.interval, args.once)
@@ -0,0 +1,143 @@
+# app/core/jobs.py
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from app.db.database import PrimaryReadSessionLocal, SessionLocal
+from app.models.job import Job
+
+# ───── ⚙️ CONFIG ──────────────────────────────────────────────
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 1))
+# A running job whose lease expires (worker died) is picked up again by another worker
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", 5))
+
+# kind -> handler(db, payload) -> bool; True when finished, False to run again (next chunk)
+_handlers: Dict[str, Callable[[Session, dict], bool]] = {}
+
+
+def job_handler(kind: str):
+    """Register a function as the handler for jobs of ``kind``."""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(db: Session, kind: str, payload: Optional[dict] = None, user_id: Optional[int] = None,
+            max_attempts: int = 5) -> Job:
+    """Add a job to the caller's session; it becomes visible to workers when the caller commits."""
+    job = Job(kind=kind, payload=payload or {}, user_id=user_id, max_attempts=max_attempts)
+    db.add(job)
+    return job
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ───── 🔒 CLAIMING ────────────────────────────────────────────
+def claim_next_job(db: Session) -> Optional[Job]:
+    """
+    Claim one runnable job. The conditional UPDATE only succeeds for one worker, so
+    several threads (or several uvicorn processes) can poll the same table safely.
+    Candidates are found on a read session: an idle poll never takes SQLite's write lock.
+    """
+    now = _now()
+    runnable = or_(
+        and_(Job.status == "queued", Job.run_after <= now),
+        and_(Job.status == "running", Job.locked_until < now),
+    )
+    read_db = PrimaryReadSessionLocal()
+    try:
+        candidates = read_db.query(Job.id, Job.status, Job.locked_until).filter(runnable)\
+                            .order_by(Job.run_after).limit(JOB_WORKERS * 2).all()
+    finally:
+        read_db.close()
+    for job_id, job_status, locked_until in candidates:
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == job_status,
+                   Job.locked_until.is_(None) if locked_until is None else Job.locked_until == locked_until)
+            .values(status="running", locked_until=now + timedelta(seconds=JOB_LEASE_SECONDS))
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.query(Job).get(job_id)
+    return None
+
+
+def run_job(db: Session, job: Job) -> None:
+    """Run a claimed job and record the outcome (done, next chunk, retry or failed)."""
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        finished = handler(db, job.payload or {})
+    except Exception as exc:
+        db.rollback()
+        job.attempts = (job.attempts or 0) + 1
+        job.last_error = repr(exc)
+        job.locked_until = None
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+        else:
+            job.status = "queued"
+            job.run_after = _now() + timedelta(seconds=JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+        db.commit()
+        print(f"❌ Job {job.id} ({job.kind}) failed:", repr(exc))
+        return
+    job.locked_until = None
+    if finished:
+        job.status = "succeeded"
+    else:
+        # Chunked handler has more to do: requeue straight away, without counting an attempt
+        job.status = "queued"
+        job.run_after = _now()
+    db.commit()
+
+
+# ───── 🏃 WORKER POOL ─────────────────────────────────────────
+class JobRunner:
+    """In-process pool of worker threads polling the jobs table."""
+
+    def __init__(self, workers: int = JOB_WORKERS, poll_seconds: float = JOB_POLL_SECONDS):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"tomolink-jobs-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _work(self):
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                job = claim_next_job(db)
+                if job is not None:
+                    run_job(db, job)
+            except Exception as exc:
+                print("❌ Job runner error:", repr(exc))
+                job = None
+            finally:
+                db.close()
+            if job is None:
+                self._stop.wait(self.poll_seconds)
+
+
+runner = JobRunner()
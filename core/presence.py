@@ -0,0 +1,65 @@
+# app/core/presence.py
+import os
+import threading
+import time
+from typing import Set
+
+# ───── ⚙️ CONFIG ──────────────────────────────────────────────
+# A user counts as online for this long after their last heartbeat / authenticated request
+PRESENCE_TTL_SECONDS = float(os.getenv("PRESENCE_TTL_SECONDS", 90))
+ONLINE_ONLY_DESCRIPTION = "Only users online as seen by the worker serving this request (presence is per process)"
+
+
+# ───── 🟢 PRESENCE REGISTRY ───────────────────────────────────
+class PresenceRegistry:
+    """
+    In-memory last-seen registry with per-user expiry.
+
+    State lives in this process only: with several workers each one sees just the users
+    whose requests / sockets it served, so ``online_ids`` (and every ``online_only`` filter
+    built on it) is a per-worker view. Run a single worker, or use sticky routing, where an
+    exact online set matters.
+    """
+
+    def __init__(self, ttl: float = PRESENCE_TTL_SECONDS):
+        self.ttl = ttl
+        self._expires = {}  # user_id -> monotonic expiry
+        self._connections = {}  # user_id -> open WebSocket count (online until they all close)
+        self._lock = threading.Lock()
+
+    def touch(self, user_id: int):
+        with self._lock:
+            self._expires[user_id] = time.monotonic() + self.ttl
+
+    def connect(self, user_id: int):
+        with self._lock:
+            self._connections[user_id] = self._connections.get(user_id, 0) + 1
+            self._expires[user_id] = time.monotonic() + self.ttl
+
+    def disconnect(self, user_id: int):
+        with self._lock:
+            remaining = self._connections.get(user_id, 0) - 1
+            if remaining > 0:
+                self._connections[user_id] = remaining
+            else:
+                self._connections.pop(user_id, None)
+                self._expires.pop(user_id, None)
+
+    def is_online(self, user_id: int) -> bool:
+        if user_id in self._connections:
+            return True
+        expiry = self._expires.get(user_id)
+        return expiry is not None and expiry > time.monotonic()
+
+    def online_ids(self) -> Set[int]:
+        """Ids of users seen within the TTL (or holding an open connection); prunes expired entries."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [uid for uid, expiry in self._expires.items()
+                       if expiry <= now and uid not in self._connections]
+            for uid in expired:
+                self._expires.pop(uid, None)
+            return set(self._expires) | set(self._connections)
+
+
+presence = PresenceRegistry()
@@ -0,0 +1,295 @@
+# app/core/profiling.py
+import functools
+import inspect
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.db.database import ReadSessionLocal
+from app.models.user import User
+from app.core.auth import decode_access_token
+
+# ───── ⚙️ CONFIG ──────────────────────────────────────────────
+PROFILE_HEADER = "x-tomolink-profile"
+_PROFILE_HEADER_RAW = PROFILE_HEADER.encode("latin-1")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "tomolink-profiles"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 1)) / 1000
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# Only frames from our own package are kept; everything else is framework noise
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# SQL statements issued while a profiled request is running (None = not profiling)
+_sql_log: ContextVar[Optional[list]] = ContextVar("sql_log", default=None)
+# Threads currently running the profiled request's sync code (shared with its StackSampler)
+_profile_threads: ContextVar[Optional[set]] = ContextVar("profile_threads", default=None)
+_listeners_lock = threading.Lock()
+_listeners_refcount = 0
+
+
+# ───── 🔬 STACK SAMPLER ───────────────────────────────────────
+class StackSampler:
+    """Periodically samples the stacks of the given threads while they run app code.
+
+    ``thread_ids`` is a live set. Sync endpoints and dependencies run in the
+    threadpool, and a worker thread is in the set only while it runs a call for
+    the profiled request (see sampled_in_thread), so pooled threads serving
+    other requests are not sampled. The event loop thread is never sampled: it
+    interleaves every request's async code, so a profile covers the sync work
+    only (async endpoints show up through what they hand to sampled_in_thread).
+    """
+
+    def __init__(self, thread_ids: set, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tomolink-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in self.thread_ids:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename.startswith(APP_ROOT) and code.co_filename != __file__:
+                        in_app = True
+                    rel = os.path.relpath(code.co_filename, APP_ROOT) if code.co_filename.startswith(APP_ROOT) \
+                        else os.path.basename(code.co_filename)
+                    stack.append(f"{code.co_name} ({rel}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if in_app:
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> list:
+        """Stacks in the collapsed format understood by flamegraph.pl / speedscope."""
+        return [f"{stack} {count}" for stack, count in self.samples.most_common()]
+
+    def call_tree(self) -> dict:
+        """Aggregate the samples into a nested {name, samples, children} tree."""
+        root = {"name": "root", "samples": 0, "children": {}}
+        for stack, count in self.samples.items():
+            node = root
+            node["samples"] += count
+            for name in stack.split(";"):
+                node = node["children"].setdefault(name, {"name": name, "samples": 0, "children": {}})
+                node["samples"] += count
+
+        def _finalise(node):
+            children = sorted(node["children"].values(), key=lambda n: n["samples"], reverse=True)
+            node["children"] = [_finalise(child) for child in children]
+            return node
+
+        return _finalise(root)
+
+
+# ───── 🧵 THREAD ATTRIBUTION ──────────────────────────────────
+def sampled_in_thread(func):
+    """
+    Decorator for sync code run in a worker thread on behalf of a request: while a
+    profiled request's call runs, its thread is in that request's sampled set.
+    The threadpool copies the request's context, which is how the call is matched.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        threads = _profile_threads.get()
+        if threads is None:
+            return func(*args, **kwargs)
+        thread_id = threading.get_ident()
+        threads.add(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            threads.discard(thread_id)
+    return wrapper
+
+
+def instrument_sync_calls(app):
+    """Wrap the sync endpoints and sync dependencies of every API route in sampled_in_thread."""
+    wrappers = {}  # one wrapper per function: FastAPI caches dependencies per callable
+
+    def _instrument(dependant):
+        for sub_dependant in dependant.dependencies:
+            _instrument(sub_dependant)
+        call = dependant.call
+        # Generator dependencies enter and exit in different threads; coroutines run on the loop
+        if not inspect.isfunction(call) or inspect.iscoroutinefunction(call) \
+                or inspect.isgeneratorfunction(call) or inspect.isasyncgenfunction(call):
+            return
+        if call not in wrappers:
+            wrappers[call] = sampled_in_thread(call)
+        dependant.call = wrappers[call]
+
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            _instrument(route.dependant)
+
+
+# ───── 🗄️ SQL CAPTURE ─────────────────────────────────────────
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _sql_log.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    log = _sql_log.get()
+    starts = conn.info.get("profile_query_start")
+    if log is None or not starts:
+        return
+    # Parameters are deliberately not recorded: they can contain password hashes and emails
+    log.append({
+        "statement": statement,
+        "duration_ms": round((time.perf_counter() - starts.pop()) * 1000, 3),
+        "executemany": executemany,
+    })
+
+
+def _attach_sql_listeners():
+    """Listeners are only installed while at least one profiled request is in flight."""
+    global _listeners_refcount
+    with _listeners_lock:
+        if _listeners_refcount == 0:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listeners_refcount += 1
+
+
+def _detach_sql_listeners():
+    global _listeners_refcount
+    with _listeners_lock:
+        _listeners_refcount -= 1
+        if _listeners_refcount == 0:
+            event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ───── 🔐 ACCESS CHECK ────────────────────────────────────────
+def _is_superuser_token(authorization: str) -> bool:
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    payload = decode_access_token(token)
+    if not payload or payload.get("sub") is None:
+        return False
+    db = ReadSessionLocal()
+    try:
+        user = db.query(User).get(int(payload["sub"]))
+        return bool(user and user.is_superuser)
+    finally:
+        db.close()
+
+
+# ───── 💾 ARTIFACT STORAGE ────────────────────────────────────
+def save_profile(profile: dict) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{profile['id']}.json")
+    with open(path, "w") as fh:
+        json.dump(profile, fh)
+    return path
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    """Load a stored profile by id (None if it does not exist or the id is malformed)."""
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+# ───── 🧩 MIDDLEWARE ──────────────────────────────────────────
+class ProfilingMiddleware:
+    """Run the request under the sampler if asked to by a superuser.
+
+    Plain ASGI middleware: requests without the profiling header are passed
+    straight through without any per-request wrapping. A profiled response is
+    held back until it completes so the timing headers can be added to it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(name == _PROFILE_HEADER_RAW for name, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+        authorization = Headers(scope=scope).get("authorization", "")
+        if not await run_in_threadpool(_is_superuser_token, authorization):
+            await self.app(scope, receive, send)
+            return
+
+        messages = []
+
+        async def buffer_send(message):
+            messages.append(message)
+
+        sql_log = []
+        threads = set()
+        sql_token = _sql_log.set(sql_log)
+        threads_token = _profile_threads.set(threads)
+        _attach_sql_listeners()
+        sampler = StackSampler(threads)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, buffer_send)
+        finally:
+            sampler.stop()
+            _detach_sql_listeners()
+            _sql_log.reset(sql_token)
+            _profile_threads.reset(threads_token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        start = next(m for m in messages if m["type"] == "http.response.start")
+        profile_id = uuid.uuid4().hex
+        sql_ms = sum(q["duration_ms"] for q in sql_log)
+        profile = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status_code": start["status"],
+            "duration_ms": round(duration_ms, 3),
+            "sample_interval_ms": sampler.interval * 1000,
+            "sample_count": sum(sampler.samples.values()),
+            "folded": sampler.folded(),
+            "call_tree": sampler.call_tree(),
+            "sql": sql_log,
+            "sql_total_ms": round(sql_ms, 3),
+        }
+        await run_in_threadpool(save_profile, profile)
+
+        headers = MutableHeaders(scope=start)
+        headers["X-Profile-Id"] = profile_id
+        headers["X-Profile-Url"] = f"/debug/profiles/{profile_id}"
+        headers["Server-Timing"] = (
+            f'total;dur={duration_ms:.3f}, sql;dur={sql_ms:.3f};desc="{len(sql_log)} queries"'
+        )
+        for message in messages:
+            await send(message)
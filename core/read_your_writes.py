@@ -0,0 +1,58 @@
+# app/core/read_your_writes.py
+import math
+import time
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import MutableHeaders
+
+from app.db.database import READ_YOUR_WRITES_SECONDS, primary_pin
+
+PRIMARY_PIN_COOKIE = "tomolink_primary_until"
+
+
+def _cookie_deadline(scope) -> float:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            morsel = SimpleCookie(value.decode("latin-1")).get(PRIMARY_PIN_COOKIE)
+            if morsel is not None:
+                try:
+                    return float(morsel.value)
+                except ValueError:
+                    return 0.0
+    return 0.0
+
+
+class ReadYourWritesMiddleware:
+    """
+    Carries the read-your-writes pin in a cookie instead of process memory.
+
+    A request that commits a write gets ``tomolink_primary_until=<unix time>``; while
+    that deadline has not passed, the client's reads go to the primary on every worker.
+    The cookie only steers the client's own reads, so a forged value costs nothing
+    but replica offload.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        received = _cookie_deadline(scope)
+        state = {"pin_until": min(received, time.time() + READ_YOUR_WRITES_SECONDS)}
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and state["pin_until"] > received:
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{PRIMARY_PIN_COOKIE}={state['pin_until']:.3f}; Max-Age={math.ceil(READ_YOUR_WRITES_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        token = primary_pin.set(state)
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            primary_pin.reset(token)
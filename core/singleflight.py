@@ -0,0 +1,111 @@
+# app/core/singleflight.py
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable
+
+# Results are shared between callers: treat them as read-only (no ORM instances!)
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# ───── 🪂 SINGLE-FLIGHT GROUP ─────────────────────────────────
+class SingleFlight:
+    """
+    Concurrent callers with the same key wait for one in-flight computation and share
+    its result. With ``ttl`` > 0 the result is also reused for that many seconds.
+    """
+
+    def __init__(self, name: str, ttl: float = 0.0):
+        self.name = name
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._cache: Dict[Hashable, tuple] = {}  # key -> (expires_at, result)
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self.cache_hits += 1
+                return cached[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if self.ttl and call.error is None:
+                    self._prune(now)
+                    self._cache[key] = (time.monotonic() + self.ttl, call.result)
+            call.event.set()
+        return call.result
+
+    def _prune(self, now: float):
+        if len(self._cache) > 1024:
+            for key in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                del self._cache[key]
+
+    def stats(self) -> dict:
+        shared = self.coalesced + self.cache_hits
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "hit_rate": round(shared / self.calls, 4) if self.calls else 0.0,
+            "ttl_seconds": self.ttl,
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str, key: Callable[..., Hashable], ttl: float = 0.0):
+    """
+    Decorator: coalesce concurrent calls whose ``key(*args, **kwargs)`` is equal.
+    Leave per-request arguments such as the db session out of the key.
+    """
+    group = _groups.setdefault(name, SingleFlight(name, ttl))
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return group.do(key(*args, **kwargs), lambda: func(*args, **kwargs))
+        wrapper.single_flight = group
+        return wrapper
+    return decorator
+
+
+def single_flight_stats() -> dict:
+    """Coalescing counters for every registered group, by name."""
+    return {name: group.stats() for name, group in _groups.items()}
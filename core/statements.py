@@ -0,0 +1,99 @@
+# app/core/statements.py
+"""
+Pre-built statements for the lookups that run on (nearly) every request.
+
+``db.query(...).filter(...)`` rebuilds the statement and its cache key on every call.
+These are constructed once at import with bound parameters, so each call only binds
+values and reuses the compiled SQL from the engine's cache.
+
+Benchmark (auth hot path, against DATABASE_URL):
+    python -m app.core.statements [--iterations N] [--user-id ID]
+"""
+import argparse
+import time
+from typing import Optional
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from app.models.friend import Friendship
+from app.models.game_profile import GameProfile
+from app.models.user import User
+
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+GAME_PROFILE_BY_USER_AND_GAME = select(GameProfile).where(
+    GameProfile.user_id == bindparam("user_id"),
+    GameProfile.game_type == bindparam("game_type")
+).limit(1)
+
+# One friendships row per direction, so checking (user_id, friend_id) is enough
+FRIENDSHIP_EXISTS = select(Friendship.user_id).where(
+    Friendship.user_id == bindparam("user_id"),
+    Friendship.friend_id == bindparam("friend_id")
+).limit(1)
+
+
+def get_user(db: Session, user_id: int) -> Optional[User]:
+    return db.execute(USER_BY_ID, {"user_id": user_id}).scalars().first()
+
+
+def get_game_profile(db: Session, user_id: int, game_type: str) -> Optional[GameProfile]:
+    return db.execute(GAME_PROFILE_BY_USER_AND_GAME, {"user_id": user_id, "game_type": game_type}).scalars().first()
+
+
+def are_friends(db: Session, user_id: int, friend_id: int) -> bool:
+    return db.execute(FRIENDSHIP_EXISTS, {"user_id": user_id, "friend_id": friend_id}).first() is not None
+
+
+# ───── ⏱️ MICROBENCHMARK ──────────────────────────────────────
+def _time_lookup(lookup, user_id: int, iterations: int) -> float:
+    """CPU seconds per call; a fresh session per call, as in a request."""
+    from app.db.database import PrimaryReadSessionLocal
+
+    started = time.process_time()
+    for _ in range(iterations):
+        db = PrimaryReadSessionLocal()
+        try:
+            lookup(db, user_id)
+        finally:
+            db.close()
+    return (time.process_time() - started) / iterations
+
+
+def benchmark(iterations: int = 5000, user_id: Optional[int] = None) -> dict:
+    from app.db.database import PrimaryReadSessionLocal
+
+    if user_id is None:
+        db = PrimaryReadSessionLocal()
+        try:
+            user_id = db.execute(select(User.id).limit(1)).scalar()
+        finally:
+            db.close()
+        if user_id is None:
+            raise SystemExit("No users in the database to look up")
+
+    def legacy(db, uid):
+        return db.query(User).filter(User.id == uid).first()
+
+    # Warm up both paths (compiled cache, connection pool)
+    _time_lookup(legacy, user_id, 50)
+    _time_lookup(get_user, user_id, 50)
+    legacy_cpu = _time_lookup(legacy, user_id, iterations)
+    cached_cpu = _time_lookup(get_user, user_id, iterations)
+    return {
+        "iterations": iterations,
+        "legacy_query_us": round(legacy_cpu * 1e6, 1),
+        "cached_statement_us": round(cached_cpu * 1e6, 1),
+        "saved_per_request_us": round((legacy_cpu - cached_cpu) * 1e6, 1),
+        "speedup": round(legacy_cpu / cached_cpu, 2) if cached_cpu else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare legacy Query vs cached statement for the user-by-id lookup")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+    for key, value in benchmark(args.iterations, args.user_id).items():
+        print(f"{key}: {value}")
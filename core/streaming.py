@@ -0,0 +1,47 @@
+# app/core/streaming.py
+import json
+import os
+from typing import Callable, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query, Session
+
+from app.db.database import ReadSessionLocal
+
+# ───── ⚙️ CONFIG ──────────────────────────────────────────────
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Rows fetched per round trip from the server-side cursor
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 500))
+
+
+def wants_ndjson(request: Request) -> bool:
+    """True if the client asked for a streamed NDJSON body via the Accept header."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def stream_ndjson(
+    build_query: Callable[[Session], Query],
+    serialize: Callable[[object], Optional[object]],
+) -> StreamingResponse:
+    """
+    Stream the rows of ``build_query(db)`` as NDJSON, one ``serialize(row)`` per line
+    (rows serialized to None are skipped).
+
+    The query runs on its own read session: request-scoped sessions from get_db /
+    get_read_db are closed before a streamed body is sent. ``yield_per`` makes the
+    driver use a server-side cursor, so memory stays bounded by STREAM_BATCH_SIZE.
+    """
+    def body():
+        db = ReadSessionLocal()
+        try:
+            for row in build_query(db).yield_per(STREAM_BATCH_SIZE):
+                item = serialize(row)
+                if item is None:
+                    continue
+                yield json.dumps(jsonable_encoder(item)) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
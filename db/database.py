@@ -1,8 +1,12 @@
 # app/db/database.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()  # load variables from .env
@@ -11,17 +15,172 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set")
 
+# Optional comma-separated list of read replicas, e.g. for local testing with two instances:
+# DATABASE_URL=postgresql://.../tomolink  REPLICA_DATABASE_URLS=postgresql://...:5433/tomolink
+REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()]
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", 10))
+# Bounds how long a dead replica can stall the request that probes it
+REPLICA_CONNECT_TIMEOUT_SECONDS = int(os.getenv("REPLICA_CONNECT_TIMEOUT_SECONDS", 2))
+# After a user writes, their reads go to the primary for this long so they see their own changes
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+# Embedded single-node mode: DATABASE_URL=sqlite:///./tomolink.db
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",           # readers never block the writer (and vice versa)
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),  # durable at checkpoints; safe with WAL
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536)) * -1,  # negative = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 268435456)),
+    "temp_store": "MEMORY",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "foreign_keys": "ON",
+}
+# Pooled connections; every session checks out its own, so this caps concurrent sessions
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", 16))
+
 # Create the SQLAlchemy engine (SQLAlchemy will manage connections)
-engine = create_engine(DATABASE_URL)
+if IS_SQLITE:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=SQLITE_POOL_SIZE,
+        max_overflow=0,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # Transactions are started by _sqlite_begin below, not implicitly by the driver
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+    # SQLite allows a single writer at a time. Write sessions take the write lock when
+    # their transaction starts (BEGIN IMMEDIATE) and queue on busy_timeout; a deferred
+    # transaction that reads first would fail with SQLITE_BUSY when it later tries to
+    # write after another writer committed. Read sessions use a plain deferred BEGIN.
+    @event.listens_for(engine, "begin")
+    def _sqlite_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if conn.get_execution_options().get("sqlite_write") else "BEGIN")
+else:
+    engine = create_engine(DATABASE_URL)
+replica_engines = [
+    create_engine(url, pool_pre_ping=True, connect_args=(
+        {"timeout": REPLICA_CONNECT_TIMEOUT_SECONDS} if url.startswith("sqlite")
+        else {"connect_timeout": REPLICA_CONNECT_TIMEOUT_SECONDS}
+    ))
+    for url in REPLICA_DATABASE_URLS
+]
 # Create a configured "SessionLocal" class
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+SessionLocal = sessionmaker(bind=engine.execution_options(sqlite_write=True) if IS_SQLITE else engine,
+                            autoflush=False, autocommit=False)
+# Reads that must see the primary (not a lagging replica) without taking SQLite's write lock
+PrimaryReadSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 # Base class for our models to inherit
 Base = declarative_base()
 
+
+# Round-robin over healthy replicas; returns None when every replica is down
+class ReplicaPool:
+    def __init__(self, engines):
+        self.engines = engines
+        self._next = 0
+        self._lock = threading.Lock()
+        self._health = {}  # engine -> (healthy, checked_at)
+
+    def _is_healthy(self, replica) -> bool:
+        now = time.monotonic()
+        healthy, checked_at = self._health.get(replica, (True, float("-inf")))
+        if now - checked_at < REPLICA_HEALTH_CHECK_SECONDS:
+            return healthy
+        # Claim this check so concurrent requests keep using the last result meanwhile
+        self._health[replica] = (healthy, now)
+        try:
+            with replica.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            healthy = True
+        except Exception as exc:
+            print("⚠️ Replica health check failed:", repr(exc))
+            healthy = False
+        self._health[replica] = (healthy, now)
+        return healthy
+
+    def choose(self):
+        for _ in range(len(self.engines)):
+            with self._lock:
+                replica = self.engines[self._next % len(self.engines)]
+                self._next += 1
+            if self._is_healthy(replica):
+                return replica
+        return None
+
+replicas = ReplicaPool(replica_engines)
+
+# Read-your-writes state of the current request: {"pin_until": unix time}. The client
+# carries the deadline in a cookie (app/core/read_your_writes.py), so the pin holds on
+# whichever worker process serves its next request. None outside a request.
+primary_pin: ContextVar[Optional[dict]] = ContextVar("primary_pin", default=None)
+
+def pin_to_primary():
+    state = primary_pin.get()
+    if state is not None:
+        state["pin_until"] = time.time() + READ_YOUR_WRITES_SECONDS
+
+def is_pinned_to_primary() -> bool:
+    state = primary_pin.get()
+    return state is not None and state["pin_until"] > time.time()
+
+
+# Session that picks its bind lazily, on first query
+class ReadSession(Session):
+    def get_bind(self, mapper=None, clause=None, **kw):
+        bind = self.info.get("bind")
+        if bind is None:
+            if is_pinned_to_primary():
+                bind = engine
+            else:
+                bind = replicas.choose() or engine
+            self.info["bind"] = bind
+        return bind
+
+ReadSessionLocal = sessionmaker(class_=ReadSession, autoflush=False, autocommit=False)
+
+
+# Pin the client to the primary once a write session actually commits changes
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_session_written(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _pin_writer_to_primary(session):
+    if session.info.pop("wrote", False) and replica_engines:
+        pin_to_primary()
+
+
 # Dependency for getting DB session (to use with FastAPI's Depends)
+# Always bound to the primary: use this for anything that writes. In SQLite mode the
+# session holds the database write lock from its first query until commit/close, so
+# keep slow work (bcrypt, external calls) out of its transaction.
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+# Dependency for read-only endpoints: routed to a replica when one is configured and healthy
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency for read-only lookups that cannot tolerate replica lag (e.g. login right after signup)
+def get_primary_read_db():
+    db = PrimaryReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,47 @@
+# app/db/functions.py
+# Dialect-portable SQL helpers: JSON columns (User.games etc.) and conflict-tolerant inserts
+from sqlalchemy import Boolean, insert as generic_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class json_array_contains(FunctionElement):
+    """``json_array_contains(User.games, "Valorant")``: true if the JSON array column holds the value."""
+    type = Boolean()
+    name = "json_array_contains"
+    inherit_cache = True
+
+
+@compiles(json_array_contains, "postgresql")
+def _json_array_contains_postgresql(element, compiler, **kw):
+    column, value = list(element.clauses)
+    return "CAST(%s AS JSONB) @> jsonb_build_array(CAST(%s AS TEXT))" % (
+        compiler.process(column, **kw), compiler.process(value, **kw))
+
+
+@compiles(json_array_contains, "sqlite")
+def _json_array_contains_sqlite(element, compiler, **kw):
+    column, value = list(element.clauses)
+    return "EXISTS (SELECT 1 FROM json_each(%s) WHERE json_each.value = %s)" % (
+        compiler.process(column, **kw), compiler.process(value, **kw))
+
+
+@compiles(json_array_contains)
+def _json_array_contains_default(element, compiler, **kw):
+    # Generic fallback: match the quoted value inside the serialized array
+    column, value = list(element.clauses)
+    return "CAST(%s AS TEXT) LIKE '%%\"' || %s || '\"%%'" % (
+        compiler.process(column, **kw), compiler.process(value, **kw))
+
+
+def insert_ignore(db: Session, model):
+    """INSERT ... ON CONFLICT DO NOTHING for ``model`` on PostgreSQL and SQLite (plain INSERT elsewhere)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return generic_insert(model)
+    return insert(model).on_conflict_do_nothing()
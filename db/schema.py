@@ -0,0 +1,36 @@
+# app/db/schema.py
+# In-place upgrades for tables that already exist: Base.metadata.create_all() only
+# creates missing tables, it never adds columns to an existing one.
+from sqlalchemy import inspect, text
+
+
+def add_missing_columns(engine, table) -> list:
+    """
+    ``ALTER TABLE ... ADD COLUMN`` for every column of ``table`` (a model's __table__)
+    that the database table lacks, plus the indexes on those columns. Idempotent.
+
+    Only constant server defaults are carried over (SQLite cannot add a column with
+    an expression default such as now()); callers backfill those themselves.
+    Returns the names of the columns that were added.
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    missing = [column for column in table.columns if column.name not in existing]
+    if not missing:
+        return []
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for column in missing:
+            ddl = "ALTER TABLE %s ADD COLUMN %s %s" % (
+                preparer.format_table(table), preparer.format_column(column),
+                column.type.compile(dialect=engine.dialect))
+            default = column.server_default.arg if column.server_default is not None else None
+            if isinstance(default, str):
+                ddl += " DEFAULT '%s'" % default.replace("'", "''")
+                if not column.nullable:
+                    ddl += " NOT NULL"
+            conn.execute(text(ddl))
+        added = {column.name for column in missing}
+        for index in table.indexes:
+            if added & {column.name for column in index.columns}:
+                index.create(conn, checkfirst=True)
+    return [column.name for column in missing]
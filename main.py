@@ -5,7 +5,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.db.database import Base, engine
-from app.routers import auth, user, quiz, lfg, friends, suggestions, feedback, dashboard, game_profiles, matchmaking
+from app.models.lfg import ensure_lfg_search_index
+from app.models.user import upgrade_users_table
+from app.routers import auth, user, quiz, lfg, friends, suggestions, feedback, dashboard, game_profiles, matchmaking, debug, jobs, admin, bootstrap, presence
+from app.core.jobs import runner as job_runner
+from app.core.profiling import ProfilingMiddleware, instrument_sync_calls
+from app.core.read_your_writes import ReadYourWritesMiddleware
 
 # ✅ Initialise the FastAPI app
 app = FastAPI(title="Tomolink API")
@@ -13,6 +18,8 @@ app = FastAPI(title="Tomolink API")
 # ⚠️ REMOVE this in production: drops everything on startup
 # Base.metadata.drop_all(bind=engine)
 Base.metadata.create_all(bind=engine)
+upgrade_users_table(engine)
+ensure_lfg_search_index(engine)
 
 # ✅ Enable CORS for frontend (React Vite)
 app.add_middleware(
@@ -23,6 +30,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ Read-your-writes: after a write, the client's reads stay on the primary (cookie-carried)
+app.add_middleware(ReadYourWritesMiddleware)
+
 # ✅ Register all API routers
 app.include_router(auth.router)
 app.include_router(user.router)
@@ -34,6 +44,20 @@ app.include_router(feedback.router)
 app.include_router(dashboard.router)
 app.include_router(game_profiles.router)
 app.include_router(matchmaking.router)
+app.include_router(debug.router)
+app.include_router(jobs.router)
+app.include_router(admin.router)
+app.include_router(bootstrap.router)
+app.include_router(presence.router)
+
+# ✅ Background job workers (account deletion, other deferred work)
+@app.on_event("startup")
+def start_job_runner():
+    job_runner.start()
+
+@app.on_event("shutdown")
+def stop_job_runner():
+    job_runner.stop()
 
 # ✅ Health check root route
 @app.get("/")
@@ -57,6 +81,10 @@ async def log_requests(request: Request, call_next):
     print(f"⬅️ Response: {response.status_code}")
     return response
 
+# ✅ On-demand profiling (superusers sending the X-Tomolink-Profile header)
+app.add_middleware(ProfilingMiddleware)
+instrument_sync_calls(app)  # after every route is registered
+
 # ✅ Entry point for running directly: `python app/main.py`
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, event, text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from pydantic import BaseModel
@@ -17,6 +17,30 @@ class FriendRequest(Base):
     from_user = relationship("User", foreign_keys=[from_user_id])
     to_user   = relationship("User", foreign_keys=[to_user_id])
 
+# Accepted friendships, materialized in both directions: (A, B) and (B, A).
+# "Friends of X" and "are X and Y friends" become primary-key lookups instead of
+# OR-ing across from_user_id/to_user_id on friend_requests.
+class Friendship(Base):
+    __tablename__ = "friendships"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    friend_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+    @staticmethod
+    def pair(user_a: int, user_b: int) -> list:
+        """Both directed rows for a friendship between two users, as insert parameters."""
+        return [{"user_id": user_a, "friend_id": user_b}, {"user_id": user_b, "friend_id": user_a}]
+
+# Backfill from already-accepted friend requests when the table is first created
+@event.listens_for(Friendship.__table__, "after_create")
+def _backfill_friendships(target, connection, **kw):
+    if not connection.dialect.has_table(connection, "friend_requests"):
+        return
+    connection.execute(text(
+        "INSERT INTO friendships (user_id, friend_id) "
+        "SELECT from_user_id, to_user_id FROM friend_requests WHERE status = 'accepted' "
+        "UNION SELECT to_user_id, from_user_id FROM friend_requests WHERE status = 'accepted'"
+    ))
+
 # Basic friend request output schema (IDs and status only)
 class FriendRequestOut(BaseModel):
     id: int
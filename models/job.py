@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, func
+from app.db.database import Base
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+# SQLAlchemy model for deferred background work (see app/core/jobs.py)
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False, index=True)       # handler name, e.g. "delete_account"
+    payload = Column(JSON, nullable=True)
+    status = Column(String, default="queued", index=True)   # "queued", "running", "succeeded" or "failed"
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    last_error = Column(String, nullable=True)
+    # Requesting user (for status checks); kept after the user row itself is gone
+    user_id = Column(Integer, nullable=True, index=True)
+    run_after = Column(DateTime(timezone=True), server_default=func.now())
+    locked_until = Column(DateTime(timezone=True), nullable=True)  # lease held by the running worker
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Pydantic schema for job status output
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
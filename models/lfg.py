@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
+from app.db.schema import add_missing_columns
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
 from app.models.user import UserBasic
 
 # SQLAlchemy model for LFG posts
@@ -11,21 +13,71 @@ class LFGPost(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     content = Column(String, nullable=False)
+    game = Column(String, nullable=True, index=True)  # optional game tag, e.g. "Valorant"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Indexed MAX() of this is the feed ETag (routers/lfg.py). Set from Python for
+    # sub-second resolution: SQLite's CURRENT_TIMESTAMP only has whole seconds.
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc), server_default=func.now(), index=True)
     # Relationship to User (post author)
     author = relationship("User")
 
 # Pydantic schema for creating a new LFG post (input)
 class LFGCreate(BaseModel):
     content: str
+    game: Optional[str] = None
 
 # Pydantic schema for LFG post output (includes author info)
 class LFGOut(BaseModel):
     id: int
     content: str
+    game: Optional[str] = None
     user_id: int
     created_at: datetime
     author: UserBasic  # nested author info (id and username)
 
     class Config:
         from_attributes = True
+
+# Full-text search structures are created with dialect-specific DDL, outside the ORM model:
+#  - PostgreSQL: generated tsvector column (maintained on insert/update) + GIN index
+#  - SQLite: external-content FTS5 table kept in sync by triggers
+# Statements are idempotent; ensure_lfg_search_index first adds the columns they index
+# (e.g. game) to lfg_posts tables created by older releases.
+LFG_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE lfg_posts ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(game, '') || ' ' || content)) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_lfg_posts_search_vector ON lfg_posts USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS lfg_posts_fts USING fts5(content, game, content='lfg_posts', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS lfg_posts_fts_ai AFTER INSERT ON lfg_posts BEGIN "
+        "INSERT INTO lfg_posts_fts(rowid, content, game) VALUES (new.id, new.content, new.game); END",
+        "CREATE TRIGGER IF NOT EXISTS lfg_posts_fts_ad AFTER DELETE ON lfg_posts BEGIN "
+        "INSERT INTO lfg_posts_fts(lfg_posts_fts, rowid, content, game) VALUES ('delete', old.id, old.content, old.game); END",
+        "CREATE TRIGGER IF NOT EXISTS lfg_posts_fts_au AFTER UPDATE ON lfg_posts BEGIN "
+        "INSERT INTO lfg_posts_fts(lfg_posts_fts, rowid, content, game) VALUES ('delete', old.id, old.content, old.game); "
+        "INSERT INTO lfg_posts_fts(rowid, content, game) VALUES (new.id, new.content, new.game); END",
+        # Index rows that existed before the FTS table did
+        "INSERT INTO lfg_posts_fts(lfg_posts_fts) VALUES ('rebuild')",
+    ],
+}
+
+def ensure_lfg_search_index(engine):
+    """
+    Bring an existing lfg_posts table up to date (missing columns) and create the
+    full-text index for the engine's dialect (no-op for other databases).
+    """
+    if "updated_at" in add_missing_columns(engine, LFGPost.__table__):
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE lfg_posts SET updated_at = created_at WHERE updated_at IS NULL"))
+    statements = LFG_SEARCH_DDL.get(engine.dialect.name, [])
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'lfg_posts_fts'")).first()
+        if exists:
+            return
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from app.db.database import Base
+from pydantic import BaseModel
+
+# SQLAlchemy model for refresh tokens (only a SHA-256 of the token is stored)
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String, unique=True, index=True, nullable=False)
+    # Every token minted by rotating the same login shares a family; reuse revokes the family
+    family_id = Column(String, index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Pydantic schema for refresh / logout requests
+class RefreshRequest(BaseModel):
+    refresh_token: str
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean
-from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, func, text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
+from app.db.schema import add_missing_columns
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 
@@ -24,9 +24,21 @@ class User(Base):
     feedback_score = Column(Integer, default=0)
     feedback_count = Column(Integer, default=0)
     overwatch_role = Column(String, nullable=True)  # e.g. "Tank", "DPS", "Support"
+    # Bumped on every ORM update; lets the feature snapshot refresh incrementally
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
+    # Bumped on writes to the user's own data; the source of the profile/friends ETags (app/core/etag.py)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     game_profiles = relationship("GameProfile", back_populates="user")
 
+def upgrade_users_table(engine):
+    """Add updated_at/version to a users table created before they existed."""
+    added = add_missing_columns(engine, User.__table__)
+    if "updated_at" in added:
+        # Existing rows count as changed now, so the next snapshot refresh picks them up
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"))
+
 # Pydantic schemas for user
 class UserCreate(BaseModel):
     username: str
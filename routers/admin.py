@@ -0,0 +1,28 @@
+# app/routers/admin.py
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.db.database import get_db
+from app.core.auth import get_current_user
+from app.core.bulk_import import import_file
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.post("/import")
+def bulk_import(
+    file: UploadFile = File(...),
+    format: str = Query(None, pattern="^(jsonl|csv)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Bulk import users, game profiles and friend edges from a JSONL or CSV file (superusers only).
+    Bad rows are reported individually; the rest of the file is still imported.
+    For very large files prefer the CLI: `python -m app.core.bulk_import FILE`.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Superuser access required")
+    fmt = format or ("csv" if (file.filename or "").endswith(".csv") else "jsonl")
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    return import_file(db, lines, fmt)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.models.user import User, UserCreate, UserLogin, UserOut
-from app.db.database import get_db
+from app.models.refresh_token import RefreshRequest
+from app.db.database import get_db, get_primary_read_db
 from app.core import auth  # includes hash_password, verify_password, create_access_token, etc.
+from app.core.etag import not_modified, user_etag
 import re
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -11,12 +13,13 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 # User signup
 @router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 def signup(user: UserCreate, db: Session = Depends(get_db)):
+    # Hash first: bcrypt is slow and must not run inside the write transaction
+    hashed_pw = auth.hash_password(user.password)
     # Check if username or email is already taken
     existing_user = db.query(User).filter((User.username == user.username) | (User.email == user.email)).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Username or email already registered")
     # Create new user with hashed password
-    hashed_pw = auth.hash_password(user.password)
     new_user = User(username=user.username, email=user.email, hashed_password=hashed_pw)
     db.add(new_user)
     db.commit()
@@ -25,19 +28,26 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
 
 # Login (for Swagger/UI via form data)
 @router.post("/login")
-def login_form(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+def login_form(db: Session = Depends(get_db), read_db: Session = Depends(get_primary_read_db),
+               form_data: OAuth2PasswordRequestForm = Depends()):
     """
     OAuth2 login (form data). Returns JWT token if credentials are valid.
+    The user is looked up on a primary read session so that bcrypt runs outside the write
+    transaction, without depending on replica lag right after signup.
     """
-    db_user = db.query(User).filter(User.username == form_data.username).first()
+    db_user = read_db.query(User).filter(User.username == form_data.username).first()
     if not db_user or not auth.verify_password(form_data.password, db_user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid username or password")
+    if db_user.is_active is False:
+        raise HTTPException(status_code=401, detail="Account is deactivated")
     token = auth.create_access_token({"sub": str(db_user.id)})
-    return {"access_token": token, "token_type": "bearer"}
+    refresh_token = auth.issue_refresh_token(db, db_user.id)
+    db.commit()
+    return {"access_token": token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 # Login (JSON payload for frontend)
 @router.post("/login/json")
-def login_json(user: UserLogin, db: Session = Depends(get_db)):
+def login_json(user: UserLogin, db: Session = Depends(get_db), read_db: Session = Depends(get_primary_read_db)):
     """
     Login endpoint that accepts JSON payload.
     Returns JWT token if credentials are valid.
@@ -57,7 +67,7 @@ def login_json(user: UserLogin, db: Session = Depends(get_db)):
                 detail="Invalid password format"
             )
             
-        db_user = db.query(User).filter(User.username == user.username).first()
+        db_user = read_db.query(User).filter(User.username == user.username).first()
         
         if not db_user:
             raise HTTPException(
@@ -70,9 +80,17 @@ def login_json(user: UserLogin, db: Session = Depends(get_db)):
                 status_code=401,
                 detail="Incorrect password"
             )
+
+        if db_user.is_active is False:
+            raise HTTPException(
+                status_code=401,
+                detail="Account is deactivated"
+            )
             
         token = auth.create_access_token({"sub": str(db_user.id)})
-        return {"access_token": token, "token_type": "bearer"}
+        refresh_token = auth.issue_refresh_token(db, db_user.id)
+        db.commit()
+        return {"access_token": token, "refresh_token": refresh_token, "token_type": "bearer"}
         
     except HTTPException as e:
         raise e
@@ -82,10 +100,30 @@ def login_json(user: UserLogin, db: Session = Depends(get_db)):
             detail="An unexpected error occurred during login"
         )
 
+# Exchange a refresh token for a new access token (no password / bcrypt involved)
+@router.post("/refresh")
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Rotate a refresh token: returns a new access token and a new refresh token.
+    The old refresh token stops working; presenting it again revokes the whole session.
+    """
+    user_id, refresh_token = auth.rotate_refresh_token(db, body.refresh_token)
+    token = auth.create_access_token({"sub": str(user_id)})
+    return {"access_token": token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+# Logout: revoke the refresh token (and every token rotated from the same login)
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(body: RefreshRequest, db: Session = Depends(get_db)):
+    auth.revoke_refresh_token(db, body.refresh_token)
+
 # Get current user (profile) using token
 @router.get("/me", response_model=UserOut)
-def get_current_user_profile(current_user: User = Depends(auth.get_current_user)):
+def get_current_user_profile(request: Request, response: Response, current_user: User = Depends(auth.get_current_user_readonly)):
     """
     Return the profile of the currently authenticated user.
+    Supports If-None-Match (304 when the profile hasn't changed).
     """
+    cached = not_modified(request, response, user_etag(current_user, "profile"))
+    if cached is not None:
+        return cached
     return current_user
@@ -0,0 +1,74 @@
+# app/routers/bootstrap.py
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.models.user import User, UserOut
+from app.models.friend import FriendRequestDetail
+from app.db.database import ReadSessionLocal, get_read_db
+from app.core.auth import get_current_user_readonly
+from app.core.profiling import sampled_in_thread
+from app.routers.dashboard import compute_dashboard_stats
+from app.routers.friends import query_friends, query_incoming_requests
+from app.routers.game_profiles import GameProfileOut, query_game_profiles
+from app.routers.suggestions import SuggestionOut, build_suggestions, query_excluded_ids
+
+router = APIRouter(prefix="/bootstrap", tags=["bootstrap"])
+
+# Each section runs on its own pooled read session, so they can run concurrently
+def _profiles(db, current_user: User):
+    return [GameProfileOut.model_validate(p) for p in query_game_profiles(db, current_user.id)]
+
+def _friend_requests(db, current_user: User):
+    return [FriendRequestDetail.model_validate(r) for r in query_incoming_requests(db, current_user.id)]
+
+def _friends(db, current_user: User):
+    return [UserOut.model_validate(u) for u in query_friends(db, current_user.id)]
+
+def _suggestions(db, current_user: User):
+    exclude_ids = query_excluded_ids(db, current_user)
+    return [SuggestionOut(**s) for s in build_suggestions(db, current_user, exclude_ids)]
+
+SECTIONS = {
+    "profiles": _profiles,
+    "stats": compute_dashboard_stats,
+    "friend_requests": _friend_requests,
+    "friends": _friends,
+    "suggestions": _suggestions,
+}
+
+@sampled_in_thread
+def _run_section(section: str, current_user: User):
+    db = ReadSessionLocal()
+    try:
+        return jsonable_encoder(SECTIONS[section](db, current_user))
+    finally:
+        db.close()
+
+@router.get("")
+async def bootstrap(
+    include: str = Query(None, description="Comma-separated sections: me," + ",".join(SECTIONS)),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_readonly)
+):
+    """
+    Everything the app needs on load in one round trip: the current user (`me`) plus
+    game profiles, dashboard stats, incoming friend requests, friends and suggestions.
+    Authenticates once and runs the section queries concurrently.
+    """
+    wanted = [s.strip() for s in include.split(",") if s.strip()] if include else ["me", *SECTIONS]
+    unknown = [s for s in wanted if s != "me" and s not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+
+    payload = {}
+    if "me" in wanted:
+        payload["me"] = jsonable_encoder(UserOut.model_validate(current_user))
+    # Give the auth session's connection back before the sections check out their own;
+    # current_user stays usable (detached, attributes already loaded)
+    await run_in_threadpool(db.close)
+    sections = [s for s in dict.fromkeys(wanted) if s != "me"]
+    results = await asyncio.gather(*(run_in_threadpool(_run_section, s, current_user) for s in sections))
+    payload.update(zip(sections, results))
+    return payload
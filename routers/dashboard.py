@@ -2,24 +2,33 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.models.friend import FriendRequest
-from app.db.database import get_db
-from app.core.auth import get_current_user
+from app.models.friend import FriendRequest, Friendship
+from app.db.database import get_read_db
+from app.core.auth import get_current_user_readonly
+from app.core.singleflight import single_flight
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+# Global counts are identical for every caller: share one computation for this long
+GLOBAL_COUNTS_TTL_SECONDS = 1.0
+
 @router.get("/stats")
-def get_dashboard_stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_dashboard_stats(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_user_readonly)):
     """Return real-time statistics for the dashboard."""
+    return compute_dashboard_stats(db, current_user)
+
+@single_flight("dashboard.global_counts", key=lambda db: "global", ttl=GLOBAL_COUNTS_TTL_SECONDS)
+def global_counts(db: Session) -> tuple:
     # Total registered users (global stat)
     total_users = db.query(User).count()
     # Total successful matches (friend connections globally)
     total_matches = db.query(FriendRequest).filter(FriendRequest.status == "accepted").count()
-    # User's number of friends (accepted friend requests involving current_user)
-    friends_count = db.query(FriendRequest).filter(
-        FriendRequest.status == "accepted",
-        (FriendRequest.from_user_id == current_user.id) | (FriendRequest.to_user_id == current_user.id)
-    ).count()
+    return total_users, total_matches
+
+def compute_dashboard_stats(db: Session, current_user: User) -> dict:
+    total_users, total_matches = global_counts(db)
+    # User's number of friends (one friendships row per friend)
+    friends_count = db.query(Friendship).filter(Friendship.user_id == current_user.id).count()
     # Pending friend requests awaiting current user (requests received by the user)
     pending_requests = db.query(FriendRequest).filter(
         FriendRequest.status == "pending",
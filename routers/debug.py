@@ -0,0 +1,35 @@
+# app/routers/debug.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.models.user import User
+from app.core.auth import get_current_user_readonly
+from app.core.profiling import load_profile
+from app.core.singleflight import single_flight_stats
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+@router.get("/profiles/{profile_id}")
+def get_profile_artifact(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|folded)$"),
+    current_user: User = Depends(get_current_user_readonly)
+):
+    """
+    Fetch a stored request profile (superusers only).
+    `format=folded` returns collapsed stacks for flamegraph.pl / speedscope.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Superuser access required")
+    profile = load_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse("\n".join(profile["folded"]) + "\n")
+    return profile
+
+@router.get("/singleflight")
+def get_single_flight_stats(current_user: User = Depends(get_current_user_readonly)):
+    """Request-coalescing counters and hit rates per single-flight group (superusers only)."""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Superuser access required")
+    return single_flight_stats()
@@ -1,11 +1,10 @@
 # app/routers/feedback.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
 from app.models.user import User
-from app.models.friend import FriendRequest
 from app.db.database import get_db
 from app.core.auth import get_current_user
+from app.core.statements import are_friends
 from pydantic import BaseModel
 from typing import Optional
 
@@ -33,14 +32,7 @@ def submit_feedback(
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
     # Verify that current_user and target_user are friends (matched)
-    friendship = db.query(FriendRequest).filter(
-        FriendRequest.status == "accepted",
-        or_(
-            and_(FriendRequest.from_user_id == current_user.id, FriendRequest.to_user_id == user_id),
-            and_(FriendRequest.from_user_id == user_id, FriendRequest.to_user_id == current_user.id)
-        )
-    ).first()
-    if not friendship:
+    if not are_friends(db, current_user.id, user_id):
         raise HTTPException(status_code=403, detail="You can only leave feedback for users you have matched with")
     # Validate rating value
     if feedback.rating < 1 or feedback.rating > 5:
@@ -57,5 +49,6 @@ def submit_feedback(
         new_score = 100
     target_user.feedback_score = int(new_score)
     target_user.feedback_count = new_count
+    target_user.version = User.version + 1
     db.commit()
     return {"detail": "Feedback submitted successfully"}
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import or_, and_
-from app.models.friend import FriendRequest, FriendRequestOut, FriendRequestDetail
+from app.models.friend import FriendRequest, Friendship, FriendRequestOut, FriendRequestDetail
 from app.models.user import User, UserOut
-from app.db.database import get_db
-from app.core.auth import get_current_user
+from app.db.database import get_db, get_read_db
+from app.db.functions import insert_ignore
+from app.core.auth import get_current_user, get_current_user_readonly
+from app.core.etag import bump_user_versions, make_etag, not_modified
 
 router = APIRouter(prefix="/friends", tags=["friends"])
 
@@ -36,14 +38,17 @@ def send_friend_request(user_id: int, db: Session = Depends(get_db), current_use
     return friend_req
 
 @router.get("/requests", response_model=list[FriendRequestDetail])
-def list_incoming_requests(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def list_incoming_requests(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_user_readonly)):
     """List all pending friend requests received by the current user."""
-    requests = db.query(FriendRequest)\
-                 .options(selectinload(FriendRequest.from_user), selectinload(FriendRequest.to_user))\
-                 .filter(FriendRequest.to_user_id == current_user.id, FriendRequest.status == "pending")\
-                 .all()
+    requests = query_incoming_requests(db, current_user.id)
     return requests  # Pydantic will serialize into FriendRequestDetail with nested user info
 
+def query_incoming_requests(db: Session, user_id: int) -> list[FriendRequest]:
+    return db.query(FriendRequest)\
+             .options(selectinload(FriendRequest.from_user), selectinload(FriendRequest.to_user))\
+             .filter(FriendRequest.to_user_id == user_id, FriendRequest.status == "pending")\
+             .all()
+
 @router.post("/requests/{request_id}/accept", response_model=FriendRequestOut)
 def accept_friend_request(request_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Accept a friend request. Current user must be the recipient (to_user)."""
@@ -56,6 +61,9 @@ def accept_friend_request(request_id: int, db: Session = Depends(get_db), curren
         raise HTTPException(status_code=400, detail="Friend request is not pending")
     # Mark as accepted
     friend_req.status = "accepted"
+    # Idempotent: the pair may already exist (e.g. materialized by a bulk import)
+    db.execute(insert_ignore(db, Friendship), Friendship.pair(friend_req.from_user_id, friend_req.to_user_id))
+    bump_user_versions(db, friend_req.from_user_id, friend_req.to_user_id)
     db.commit()
     db.refresh(friend_req)
     return friend_req
@@ -76,20 +84,22 @@ def reject_friend_request(request_id: int, db: Session = Depends(get_db), curren
     return {"detail": "Friend request rejected"}
 
 @router.get("", response_model=list[UserOut])
-def list_friends(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """List all friends of the current user (all accepted friend connections)."""
-    # Find all accepted friend request records involving the current user
-    accepted_rels = db.query(FriendRequest).filter(
-        FriendRequest.status == "accepted",
-        or_(FriendRequest.from_user_id == current_user.id, FriendRequest.to_user_id == current_user.id)
-    ).all()
-    # Collect the IDs of the other user in each friendship
-    friend_ids = []
-    for fr in accepted_rels:
-        if fr.from_user_id == current_user.id:
-            friend_ids.append(fr.to_user_id)
-        else:
-            friend_ids.append(fr.from_user_id)
-    # Fetch User profiles for all friend IDs
-    friends = db.query(User).filter(User.id.in_(friend_ids)).all()
-    return friends
+def list_friends(request: Request, response: Response, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_user_readonly)):
+    """
+    List all friends of the current user (all accepted friend connections).
+    Supports If-None-Match: the ETag covers the friend ids and each friend's version.
+    """
+    # Cheap (id, version) pairs decide whether the full profiles are needed at all
+    versions = sorted(tuple(row) for row in _friends_query(db, current_user.id, User.id, User.version))
+    cached = not_modified(request, response, make_etag("friends", current_user.id, versions))
+    if cached is not None:
+        return cached
+    return query_friends(db, current_user.id)
+
+def _friends_query(db: Session, user_id: int, *entities):
+    # Single (user_id, friend_id) primary-key range scan joined to users
+    return db.query(*entities).join(Friendship, Friendship.friend_id == User.id)\
+             .filter(Friendship.user_id == user_id)
+
+def query_friends(db: Session, user_id: int) -> list[User]:
+    return _friends_query(db, user_id, User).all()
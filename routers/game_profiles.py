@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.models.game_profile import GameProfile
 from app.models.user import User
-from app.db.database import get_db
-from app.core.auth import get_current_user
+from app.db.database import get_db, get_read_db
+from app.core.auth import get_current_user, get_current_user_readonly
+from app.core.etag import bump_user_versions, not_modified, user_etag
+from app.core import statements
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/profiles", tags=["game_profiles"])
@@ -14,8 +16,8 @@ class GameProfileCreate(BaseModel):
     playstyle: str
     communication_preference: str
     role_preference: str
-    rank: str = None
-    additional_preferences: dict = None
+    rank: Optional[str] = None
+    additional_preferences: Optional[dict] = None
 
 class GameProfileOut(GameProfileCreate):
     id: int
@@ -32,15 +34,13 @@ def create_game_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Create or update a game profile for the current user."""
-    existing_profile = db.query(GameProfile).filter(
-        GameProfile.user_id == current_user.id,
-        GameProfile.game_type == game_type
-    ).first()
+    existing_profile = statements.get_game_profile(db, current_user.id, game_type)
 
     if existing_profile:
         # Update existing profile
         for key, value in profile.dict().items():
             setattr(existing_profile, key, value)
+        bump_user_versions(db, current_user.id)
         db.commit()
         db.refresh(existing_profile)
         return existing_profile
@@ -52,6 +52,7 @@ def create_game_profile(
             **profile.dict()
         )
         db.add(new_profile)
+        bump_user_versions(db, current_user.id)
         db.commit()
         db.refresh(new_profile)
         return new_profile
@@ -59,14 +60,11 @@ def create_game_profile(
 @router.get("/{game_type}", response_model=GameProfileOut)
 def get_game_profile(
     game_type: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_readonly)
 ):
     """Get the current user's game profile for a specific game."""
-    profile = db.query(GameProfile).filter(
-        GameProfile.user_id == current_user.id,
-        GameProfile.game_type == game_type
-    ).first()
+    profile = statements.get_game_profile(db, current_user.id, game_type)
     
     if not profile:
         raise HTTPException(status_code=404, detail="Game profile not found")
@@ -74,11 +72,19 @@ def get_game_profile(
 
 @router.get("", response_model=List[GameProfileOut])
 def list_game_profiles(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_readonly)
 ):
-    """Get all game profiles for the current user."""
-    return db.query(GameProfile).filter(GameProfile.user_id == current_user.id).all()
+    """Get all game profiles for the current user (304 if If-None-Match still matches)."""
+    cached = not_modified(request, response, user_etag(current_user, "game_profiles"))
+    if cached is not None:
+        return cached
+    return query_game_profiles(db, current_user.id)
+
+def query_game_profiles(db: Session, user_id: int) -> List[GameProfile]:
+    return db.query(GameProfile).filter(GameProfile.user_id == user_id).all()
 
 @router.delete("/{game_type}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_game_profile(
@@ -87,14 +93,12 @@ def delete_game_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Delete a game profile for the current user."""
-    profile = db.query(GameProfile).filter(
-        GameProfile.user_id == current_user.id,
-        GameProfile.game_type == game_type
-    ).first()
+    profile = statements.get_game_profile(db, current_user.id, game_type)
     
     if not profile:
         raise HTTPException(status_code=404, detail="Game profile not found")
     
     db.delete(profile)
+    bump_user_versions(db, current_user.id)
     db.commit()
     return None 
\ No newline at end of file
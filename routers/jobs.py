@@ -0,0 +1,24 @@
+# app/routers/jobs.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.models.job import Job, JobOut
+from app.db.database import get_primary_read_db
+from app.core.auth import get_current_user_id
+from app.core.statements import get_user
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/{job_id}", response_model=JobOut)
+def get_job_status(job_id: int, db: Session = Depends(get_primary_read_db), user_id: int = Depends(get_current_user_id)):
+    """
+    Get the status of a background job. Only its requester or a superuser can see it.
+    The requester keeps access after deactivating their account, so they can follow its deletion.
+    """
+    job = db.query(Job).get(job_id)
+    if job and job.user_id != user_id:
+        requester = get_user(db, user_id)
+        if not requester or requester.is_active is False or not requester.is_superuser:
+            job = None
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,28 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.sql import table, column
+from typing import Optional
 from app.models.lfg import LFGPost, LFGCreate, LFGOut
 from app.models.user import User
-from app.db.database import get_db
-from app.core.auth import get_current_user
+from app.db.database import get_db, get_read_db
+from app.core.auth import get_current_user, get_current_user_readonly
+from app.core.streaming import wants_ndjson, stream_ndjson
+from app.core.etag import etag_headers, make_etag, not_modified
 
 router = APIRouter(prefix="/lfg", tags=["lfg"])
 
+# SQLite FTS5 index over lfg_posts (created by ensure_lfg_search_index)
+LFG_FTS = table("lfg_posts_fts", column("rowid"), column("rank"))
+
 @router.post("", response_model=LFGOut, status_code=status.HTTP_201_CREATED)
 def create_lfg_post(post: LFGCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Create a new LFG post by the current user."""
-    new_post = LFGPost(user_id=current_user.id, content=post.content)
+    new_post = LFGPost(user_id=current_user.id, content=post.content, game=post.game)
     db.add(new_post)
     db.commit()
     db.refresh(new_post)
     return new_post
 
+def _feed_query(db: Session):
+    return db.query(LFGPost).options(selectinload(LFGPost.author))\
+             .order_by(LFGPost.created_at.desc())
+
 @router.get("", response_model=list[LFGOut])
-def list_lfg_posts(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Get all LFG posts (latest first). Requires login."""
-    posts = db.query(LFGPost).options(selectinload(LFGPost.author))\
-                .order_by(LFGPost.created_at.desc()).all()
+def list_lfg_posts(request: Request, response: Response, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_user_readonly)):
+    """
+    Get all LFG posts (latest first). Requires login.
+    Send `Accept: application/x-ndjson` to stream posts instead of building one list.
+    Supports If-None-Match: the ETag covers the representation (JSON or NDJSON), the
+    post count (deletes) and the latest updated_at (inserts and edits), both from indexes.
+    """
+    ndjson = wants_ndjson(request)
+    # Separate scalar subqueries: MAX() alone is a single index seek, COUNT() a covering-index scan
+    post_count, last_updated = db.query(
+        db.query(func.count(LFGPost.id)).scalar_subquery(),
+        db.query(func.max(LFGPost.updated_at)).scalar_subquery(),
+    ).one()
+    etag = make_etag("lfg", "ndjson" if ndjson else "json", post_count, last_updated)
+    cached = not_modified(request, response, etag, vary="Accept")
+    if cached is not None:
+        return cached
+    if ndjson:
+        streamed = stream_ndjson(_feed_query, LFGOut.model_validate)
+        streamed.headers.update(etag_headers(etag, vary="Accept"))
+        return streamed
+    posts = _feed_query(db).all()
     return posts  # Each post will include author info (id and username) in the response
 
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input can't inject FTS5 syntax; terms are ANDed
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+@router.get("/search", response_model=list[LFGOut])
+def search_lfg_posts(
+    q: Optional[str] = Query(None, description="Free-text search over post content and game tag"),
+    game: Optional[str] = Query(None, description="Only posts tagged with this game"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_readonly)
+):
+    """
+    Search LFG posts, best matches first (newest first when only `game` is given).
+    Uses the tsvector/GIN index on PostgreSQL and FTS5 on SQLite.
+    """
+    query = db.query(LFGPost).options(selectinload(LFGPost.author))
+    if game:
+        query = query.filter(LFGPost.game == game)
+    terms = (q or "").strip()
+    if not terms:
+        query = query.order_by(LFGPost.created_at.desc(), LFGPost.id.desc())
+    elif db.get_bind().dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery("simple", terms)
+        vector = literal_column("lfg_posts.search_vector")
+        query = query.filter(vector.op("@@")(tsquery))\
+                     .order_by(func.ts_rank(vector, tsquery).desc(), LFGPost.id.desc())
+    elif db.get_bind().dialect.name == "sqlite":
+        # FTS5's rank is bm25: lower is better
+        query = query.join(LFG_FTS, LFG_FTS.c.rowid == LFGPost.id)\
+                     .filter(text("lfg_posts_fts MATCH :fts_query")).params(fts_query=_fts5_query(terms))\
+                     .order_by(LFG_FTS.c.rank, LFGPost.id.desc())
+    else:
+        query = query.filter(LFGPost.content.ilike(f"%{terms}%")).order_by(LFGPost.id.desc())
+    return query.offset(offset).limit(limit).all()
+
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_lfg_post(post_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Delete an LFG post. Only the post owner can delete their post."""
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import time
 from app.models.game_profile import GameProfile
 from app.models.user import User
-from app.db.database import get_db
-from app.core.auth import get_current_user
+from app.db.database import get_read_db
+from app.core.auth import get_current_user_readonly
+from app.core.streaming import wants_ndjson, stream_ndjson
+from app.core.presence import ONLINE_ONLY_DESCRIPTION, presence
+from app.core.singleflight import single_flight
+from app.core.statements import get_game_profile
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/matchmaking", tags=["matchmaking"])
 
+# Party search bounds: only the top candidates are considered, with a fixed beam and time budget
+PARTY_CANDIDATE_POOL = 50
+PARTY_BEAM_WIDTH = 8
+PARTY_TIME_BUDGET_SECONDS = 0.05
+# Identical (game_type, filters) scans running at the same time share one query
+CANDIDATE_SCAN_TTL_SECONDS = 0.5
+
 class MatchmakingFilters(BaseModel):
-    playstyle: str = None
-    communication_preference: str = None
-    role_preference: str = None
-    min_rank: str = None
-    max_rank: str = None
+    playstyle: Optional[str] = None
+    communication_preference: Optional[str] = None
+    role_preference: Optional[str] = None
+    min_rank: Optional[str] = None
+    max_rank: Optional[str] = None
 
 class MatchResult(BaseModel):
     user_id: int
@@ -23,12 +35,20 @@ class MatchResult(BaseModel):
     playstyle: str
     communication_preference: str
     role_preference: str
-    rank: str
+    rank: Optional[str] = None  # nullable on GameProfile
     match_score: float
 
     class Config:
         from_attributes = True
 
+class PartyResult(BaseModel):
+    game_type: str
+    size: int
+    members: List[MatchResult]  # excludes the current user; match_score is vs the current user
+    party_score: float          # mean pairwise compatibility across the whole party
+    complete: bool              # False if there weren't enough candidates to fill the party
+    timed_out: bool             # True if the beam search hit the time budget and finished greedily
+
 def calculate_match_score(profile1: GameProfile, profile2: GameProfile) -> float:
     """Calculate a compatibility score between two profiles."""
     score = 0.0
@@ -53,28 +73,34 @@ def calculate_match_score(profile1: GameProfile, profile2: GameProfile) -> float
     
     return score
 
-@router.post("/{game_type}", response_model=List[MatchResult])
-def find_matches(
-    game_type: str,
-    filters: MatchmakingFilters = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Find potential matches for the current user based on their game profile and filters."""
-    # Get current user's profile
-    user_profile = db.query(GameProfile).filter(
-        GameProfile.user_id == current_user.id,
-        GameProfile.game_type == game_type
-    ).first()
+def _get_user_profile(db: Session, current_user: User, game_type: str) -> GameProfile:
+    """Get current user's profile for the game (404 if they have none)."""
+    user_profile = get_game_profile(db, current_user.id, game_type)
     
     if not user_profile:
         raise HTTPException(status_code=404, detail="Game profile not found")
-    
-    # Query potential matches
-    query = db.query(GameProfile, User).join(User).filter(
+    return user_profile
+
+def _candidate_query(db: Session, game_type: str, filters: MatchmakingFilters = None,
+                     online_only: bool = False, exclude_user_id: int = None):
+    """
+    Query potential matches for the game with the optional filters applied.
+    Rows are plain columns (profile fields + user_id/username), not ORM instances,
+    so they can be shared between requests.
+    """
+    query = db.query(
+        GameProfile.user_id, GameProfile.game_type, GameProfile.playstyle,
+        GameProfile.communication_preference, GameProfile.role_preference, GameProfile.rank,
+        User.username
+    ).join(User).filter(
         GameProfile.game_type == game_type,
-        GameProfile.user_id != current_user.id
+        User.is_active.isnot(False)
     )
+    if exclude_user_id is not None:
+        query = query.filter(GameProfile.user_id != exclude_user_id)
+    if online_only:
+        # Only players currently online (presence registry), before any scoring
+        query = query.filter(GameProfile.user_id.in_(presence.online_ids()))
     
     # Apply filters
     if filters:
@@ -88,26 +114,141 @@ def find_matches(
             query = query.filter(GameProfile.rank >= filters.min_rank)
         if filters.max_rank:
             query = query.filter(GameProfile.rank <= filters.max_rank)
-    
-    # Get potential matches
-    potential_matches = query.all()
+    return query
+
+@single_flight(
+    "matchmaking.candidates",
+    key=lambda db, game_type, filters=None, online_only=False: (
+        game_type, tuple(sorted(filters.dict().items())) if filters else (), online_only
+    ),
+    ttl=CANDIDATE_SCAN_TTL_SECONDS
+)
+def scan_candidates(db: Session, game_type: str, filters: MatchmakingFilters = None, online_only: bool = False) -> tuple:
+    """Candidate rows for (game_type, filters), shared by concurrent callers (read-only)."""
+    return tuple(_candidate_query(db, game_type, filters, online_only).all())
+
+def _match_result(profile, match_score: float) -> MatchResult:
+    return MatchResult(
+        user_id=profile.user_id,
+        username=profile.username,
+        game_type=profile.game_type,
+        playstyle=profile.playstyle,
+        communication_preference=profile.communication_preference,
+        role_preference=profile.role_preference,
+        rank=profile.rank,
+        match_score=match_score
+    )
+
+@router.post("/{game_type}", response_model=List[MatchResult])
+def find_matches(
+    game_type: str,
+    request: Request,
+    filters: MatchmakingFilters = None,
+    online_only: bool = Query(False, description=ONLINE_ONLY_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_readonly)
+):
+    """
+    Find potential matches for the current user based on their game profile and filters.
+    Send `Accept: application/x-ndjson` to stream matches unsorted (in database order).
+    """
+    user_profile = _get_user_profile(db, current_user, game_type)
+    if wants_ndjson(request):
+        return stream_ndjson(
+            lambda stream_db: _candidate_query(stream_db, game_type, filters, online_only, exclude_user_id=current_user.id),
+            lambda row: _match_result(row, calculate_match_score(user_profile, row))
+        )
+
+    potential_matches = scan_candidates(db, game_type, filters, online_only)
     
     # Calculate match scores and format results
     results = []
-    for profile, user in potential_matches:
+    for profile in potential_matches:
+        if profile.user_id == current_user.id:
+            continue
         match_score = calculate_match_score(user_profile, profile)
-        results.append(MatchResult(
-            user_id=user.id,
-            username=user.username,
-            game_type=profile.game_type,
-            playstyle=profile.playstyle,
-            communication_preference=profile.communication_preference,
-            role_preference=profile.role_preference,
-            rank=profile.rank,
-            match_score=match_score
-        ))
+        results.append(_match_result(profile, match_score))
     
     # Sort by match score (highest first)
     results.sort(key=lambda x: x.match_score, reverse=True)
     
-    return results 
\ No newline at end of file
+    return results
+
+def build_party(user_profile: GameProfile, candidates: List[GameProfile], size: int,
+                beam_width: int = PARTY_BEAM_WIDTH, time_budget: float = PARTY_TIME_BUDGET_SECONDS):
+    """
+    Pick up to size-1 candidates maximising the summed pairwise calculate_match_score
+    of the party (current user included), using a beam search over `candidates`.
+    Returns (chosen candidate indexes, pairwise score sum, timed_out).
+    """
+    deadline = time.perf_counter() + time_budget
+    # Index 0 is the current user; pair scores are computed lazily and memoised
+    profiles = [user_profile] + list(candidates)
+    pair_cache = {}
+
+    def pair(a: int, b: int) -> float:
+        key = (a, b) if a < b else (b, a)
+        if key not in pair_cache:
+            pair_cache[key] = calculate_match_score(profiles[key[0]], profiles[key[1]])
+        return pair_cache[key]
+
+    def gain(members: tuple, idx: int) -> float:
+        return pair(0, idx) + sum(pair(m, idx) for m in members)
+
+    slots = min(size - 1, len(candidates))
+    beam = [((), 0.0)]  # (member indexes in profiles, pairwise score sum)
+    timed_out = False
+    for _ in range(slots):
+        if time.perf_counter() > deadline:
+            timed_out = True
+            break
+        expanded = {}
+        for members, total in beam:
+            for idx in range(1, len(profiles)):
+                if idx in members:
+                    continue
+                key = tuple(sorted(members + (idx,)))
+                if key not in expanded:
+                    expanded[key] = total + gain(members, idx)
+        beam = sorted(expanded.items(), key=lambda item: item[1], reverse=True)[:beam_width]
+
+    members, total = beam[0]
+    # Out of time: fill the remaining slots greedily from the best partial party
+    while len(members) < slots:
+        idx = max((i for i in range(1, len(profiles)) if i not in members), key=lambda i: gain(members, i))
+        total += gain(members, idx)
+        members = members + (idx,)
+    return [m - 1 for m in members], total, timed_out
+
+@router.post("/{game_type}/party", response_model=PartyResult)
+def find_party(
+    game_type: str,
+    size: int = Query(5, ge=2, le=10),
+    filters: MatchmakingFilters = None,
+    online_only: bool = Query(False, description=ONLINE_ONLY_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_readonly)
+):
+    """Build the best N-person party around the current user (including them)."""
+    user_profile = _get_user_profile(db, current_user, game_type)
+    potential_matches = scan_candidates(db, game_type, filters, online_only)
+
+    # Narrow to the strongest individual matches before the combinatorial search
+    scored = sorted(
+        ((calculate_match_score(user_profile, profile), profile)
+         for profile in potential_matches if profile.user_id != current_user.id),
+        key=lambda item: item[0], reverse=True
+    )[:PARTY_CANDIDATE_POOL]
+    chosen, pair_total, timed_out = build_party(user_profile, [profile for _, profile in scored], size)
+
+    members = [_match_result(scored[i][1], scored[i][0]) for i in chosen]
+    party_size = len(members) + 1
+    pair_count = party_size * (party_size - 1) / 2
+    return PartyResult(
+        game_type=game_type,
+        size=party_size,
+        members=members,
+        party_score=pair_total / pair_count if pair_count else 0.0,
+        complete=party_size == size,
+        timed_out=timed_out
+    )
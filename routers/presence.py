@@ -0,0 +1,40 @@
+# app/routers/presence.py
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from app.core.auth import oauth2_scheme, token_user_id
+from app.core.presence import presence
+
+router = APIRouter(prefix="/presence", tags=["presence"])
+
+# Heartbeats only need the token subject (token_user_id), not a database lookup
+@router.post("/heartbeat", status_code=status.HTTP_204_NO_CONTENT)
+def heartbeat(token: str = Depends(oauth2_scheme)):
+    """Mark the current user as online for the next PRESENCE_TTL_SECONDS."""
+    presence.touch(token_user_id(token))
+
+@router.get("/online")
+def online_count(token: str = Depends(oauth2_scheme)):
+    """Number of users currently online (as seen by this worker)."""
+    token_user_id(token)
+    return {"online": len(presence.online_ids())}
+
+@router.websocket("/ws")
+async def presence_socket(websocket: WebSocket, token: str):
+    """
+    Keep the user online for as long as the socket is open (`/presence/ws?token=...`).
+    Any message received refreshes the last-seen time.
+    """
+    try:
+        user_id = token_user_id(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    presence.connect(user_id)
+    try:
+        while True:
+            await websocket.receive_text()
+            presence.touch(user_id)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        presence.disconnect(user_id)
@@ -1,9 +1,12 @@
 # app/routers/quiz.py (suggestions with weights)
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.db.database import get_db
-from app.core.auth import get_current_user
+from app.db.database import get_read_db
+from app.db.functions import json_array_contains
+from app.core.auth import get_current_user_readonly
+from app.core.streaming import wants_ndjson, stream_ndjson
+from app.core.feature_snapshot import candidate_features
 from typing import List, Optional
 
 router = APIRouter(prefix="/quiz", tags=["quiz"])
@@ -25,34 +28,48 @@ def compute_compatibility(current_user: User, candidate: User) -> int:
                 score += 5
     return score
 
+def _candidate_query(db: Session, current_user: User, game: Optional[str], platform: Optional[str], region: Optional[str]):
+    query = db.query(User).filter(User.id != current_user.id, User.is_active.isnot(False))
+    if game:
+        query = query.filter(json_array_contains(User.games, game))
+    if platform:
+        query = query.filter(User.platform == platform)
+    if region:
+        query = query.filter(User.region == region)
+    return query
+
+def _suggestion(current_user: User, user: User) -> Optional[dict]:
+    if user.is_private:
+        return None
+    return {
+        "id": user.id,
+        "username": user.username,
+        "platform": user.platform,
+        "region": user.region,
+        "games": user.games,
+        "score": compute_compatibility(current_user, user)
+    }
+
+# Send `Accept: application/x-ndjson` to stream results unsorted (in database order)
 @router.get("/suggestions", response_model=List[dict])
 def suggest_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_readonly),
     game: Optional[str] = Query(None),
     platform: Optional[str] = Query(None),
     region: Optional[str] = Query(None),
 ):
-    query = db.query(User).filter(User.id != current_user.id)
-    if game:
-        query = query.filter(User.games.contains([game]))
-    if platform:
-        query = query.filter(User.platform == platform)
-    if region:
-        query = query.filter(User.region == region)
+    if wants_ndjson(request):
+        return stream_ndjson(
+            lambda stream_db: _candidate_query(stream_db, current_user, game, platform, region),
+            lambda user: _suggestion(current_user, user)
+        )
 
-    candidates = query.all()
+    candidates = candidate_features(db, _candidate_query(db, current_user, game, platform, region))
     results = []
     for user in candidates:
-        if user.is_private:
-            continue
-        score = compute_compatibility(current_user, user)
-        results.append({
-            "id": user.id,
-            "username": user.username,
-            "platform": user.platform,
-            "region": user.region,
-            "games": user.games,
-            "score": score
-        })
+        suggestion = _suggestion(current_user, user)
+        if suggestion is not None:
+            results.append(suggestion)
     return sorted(results, key=lambda x: x["score"], reverse=True)
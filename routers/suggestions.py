@@ -1,12 +1,16 @@
 # app/routers/suggestions.py
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from app.models.user import User
-from app.models.friend import FriendRequest
-from app.db.database import get_db
-from app.core.auth import get_current_user
+from app.models.friend import FriendRequest, Friendship
+from app.db.database import get_read_db
+from app.db.functions import json_array_contains
+from app.core.auth import get_current_user_readonly
+from app.core.streaming import wants_ndjson, stream_ndjson
+from app.core.presence import ONLINE_ONLY_DESCRIPTION, presence
+from app.core.feature_snapshot import candidate_features
 from typing import Optional, List
 from pydantic import BaseModel
 
@@ -50,51 +54,80 @@ def compute_compatibility(current_user: User, candidate: User) -> int:
         score += 10
     return score
 
+# ✅ Candidate query shared by the list and NDJSON streaming modes
+def _candidate_query(db: Session, current_user: User, game: Optional[str], platform: Optional[str], region: Optional[str],
+                     online_only: bool = False):
+    query = db.query(User).filter(User.id != current_user.id, User.is_active.isnot(False))
+    if online_only:
+        # Intersect with the presence registry before anything is loaded or scored
+        query = query.filter(User.id.in_(presence.online_ids()))
+    if game:
+        query = query.filter(json_array_contains(User.games, game))
+    if platform:
+        query = query.filter(User.platform == platform)
+    if region:
+        query = query.filter(User.region == region)
+    return query
+
+def _suggestion(current_user: User, user: User, exclude_ids: set) -> Optional[dict]:
+    if user.id in exclude_ids or user.is_private:
+        return None
+    return {
+        "id": user.id,
+        "username": user.username,
+        "platform": user.platform,
+        "region": user.region,
+        "games": user.games or [],
+        "overwatch_role": user.overwatch_role,
+        "score": compute_compatibility(current_user, user)
+    }
+
 # ✅ Suggestion endpoint with filtering + exclusion logic
+# Send `Accept: application/x-ndjson` to stream results unsorted (in database order)
 @router.get("/", response_model=List[SuggestionOut])
 def suggest_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_readonly),
     game: Optional[str] = Query(None),
     platform: Optional[str] = Query(None),
-    region: Optional[str] = Query(None)
+    region: Optional[str] = Query(None),
+    online_only: bool = Query(False, description=ONLINE_ONLY_DESCRIPTION)
 ):
-    query = db.query(User).filter(User.id != current_user.id)
-    if game:
-        query = query.filter(User.games.contains([game]))
-    if platform:
-        query = query.filter(User.platform == platform)
-    if region:
-        query = query.filter(User.region == region)
+    exclude_ids = query_excluded_ids(db, current_user)
 
-    candidates = query.all()
+    if wants_ndjson(request):
+        return stream_ndjson(
+            lambda stream_db: _candidate_query(stream_db, current_user, game, platform, region, online_only),
+            lambda user: _suggestion(current_user, user, exclude_ids)
+        )
 
+    return build_suggestions(db, current_user, exclude_ids, game, platform, region, online_only)
+
+# ✅ Users already connected to (or with a pending request with) the current user
+def query_excluded_ids(db: Session, current_user: User) -> set:
     exclude_ids = {current_user.id}
-    existing_rels = db.query(FriendRequest).filter(
-        FriendRequest.status == "accepted",
-        or_(FriendRequest.from_user_id == current_user.id, FriendRequest.to_user_id == current_user.id)
-    ).all()
-    pending_reqs = db.query(FriendRequest).filter(
+    friends = db.query(Friendship.friend_id).filter(Friendship.user_id == current_user.id).all()
+    exclude_ids.update(friend_id for (friend_id,) in friends)
+    pending_reqs = db.query(FriendRequest.from_user_id, FriendRequest.to_user_id).filter(
         FriendRequest.status == "pending",
         or_(FriendRequest.from_user_id == current_user.id, FriendRequest.to_user_id == current_user.id)
     ).all()
-    for fr in existing_rels + pending_reqs:
+    for fr in pending_reqs:
         exclude_ids.add(fr.from_user_id)
         exclude_ids.add(fr.to_user_id)
+    return exclude_ids
 
+# ✅ Ranked suggestions (highest score first)
+def build_suggestions(db: Session, current_user: User, exclude_ids: set, game: Optional[str] = None,
+                      platform: Optional[str] = None, region: Optional[str] = None,
+                      online_only: bool = False) -> List[dict]:
+    # Filters run in SQL; scoring fields come from the shared feature snapshot when one is mapped
+    candidates = candidate_features(db, _candidate_query(db, current_user, game, platform, region, online_only))
     results = []
     for user in candidates:
-        if user.id in exclude_ids or user.is_private:
-            continue
-        score = compute_compatibility(current_user, user)
-        results.append({
-            "id": user.id,
-            "username": user.username,
-            "platform": user.platform,
-            "region": user.region,
-            "games": user.games or [],
-            "overwatch_role": user.overwatch_role,
-            "score": score
-        })
+        suggestion = _suggestion(current_user, user, exclude_ids)
+        if suggestion is not None:
+            results.append(suggestion)
 
     return sorted(results, key=lambda x: x["score"], reverse=True)
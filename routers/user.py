@@ -1,14 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy import or_, tuple_
 from app.models.user import User, UserOut, UserEdit, QuizUpdate
+from app.models.friend import FriendRequest, Friendship
+from app.models.lfg import LFGPost
+from app.models.game_profile import GameProfile
+from app.models.refresh_token import RefreshToken
 from app.db.database import get_db
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, get_current_user_readonly
+from app.core.jobs import enqueue, job_handler
+from app.core.etag import not_modified, user_etag
 
 router = APIRouter(prefix="/user", tags=["user"])
 
+# Rows deleted per transaction when cleaning up a deleted account
+DELETE_CHUNK_SIZE = 500
+
 @router.get("/profile", response_model=UserOut)
-def get_profile(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Get the current user's profile."""
+def get_profile(request: Request, response: Response, current_user: User = Depends(get_current_user_readonly)):
+    """Get the current user's profile (304 if If-None-Match still matches)."""
+    cached = not_modified(request, response, user_etag(current_user, "profile"))
+    if cached is not None:
+        return cached
     return current_user
 
 @router.put("/profile/edit", response_model=UserOut)
@@ -18,6 +31,7 @@ def edit_profile(data: UserEdit, db: Session = Depends(get_db), current_user: Us
     updates = data.dict(exclude_unset=True)
     for field, value in updates.items():
         setattr(current_user, field, value)
+    current_user.version = User.version + 1
     db.commit()
     db.refresh(current_user)
     return current_user
@@ -26,13 +40,41 @@ def edit_profile(data: UserEdit, db: Session = Depends(get_db), current_user: Us
 def update_quiz_answers(quiz: QuizUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Save or update the current user's quiz answers (onboarding questionnaire)."""
     current_user.quiz_answers = quiz.answers
+    current_user.version = User.version + 1
     db.commit()
     db.refresh(current_user)
     return current_user
 
-@router.delete("/delete", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/delete", status_code=status.HTTP_202_ACCEPTED)
 def delete_account(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Delete the current user's account (and related data)."""
-    db.delete(current_user)
+    """
+    Delete the current user's account (and related data).
+    The account is deactivated immediately; the rows are removed by a background job.
+    """
+    current_user.is_active = False
+    job = enqueue(db, "delete_account", {"user_id": current_user.id}, user_id=current_user.id)
+    db.commit()
+    return {"detail": "Account scheduled for deletion", "job_id": job.id}
+
+@job_handler("delete_account")
+def delete_account_job(db: Session, payload: dict) -> bool:
+    """Delete a deactivated account's data one chunk per run, then the user row itself."""
+    user_id = payload["user_id"]
+    # (model, primary key columns, rows belonging to the user)
+    related = (
+        (Friendship, (Friendship.user_id, Friendship.friend_id),
+         or_(Friendship.user_id == user_id, Friendship.friend_id == user_id)),
+        (FriendRequest, (FriendRequest.id,), or_(FriendRequest.from_user_id == user_id, FriendRequest.to_user_id == user_id)),
+        (LFGPost, (LFGPost.id,), LFGPost.user_id == user_id),
+        (GameProfile, (GameProfile.id,), GameProfile.user_id == user_id),
+        (RefreshToken, (RefreshToken.id,), RefreshToken.user_id == user_id),
+    )
+    for model, key, criteria in related:
+        keys = [tuple(row) for row in db.query(*key).filter(criteria).limit(DELETE_CHUNK_SIZE)]
+        if keys:
+            db.query(model).filter(tuple_(*key).in_(keys)).delete(synchronize_session=False)
+            db.commit()
+            return False
+    db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
     db.commit()
-    return {"detail": "Account deleted"}
+    return True
@@ -0,0 +1,93 @@
+# tests/conftest.py
+"""
+Shared fixtures. The suite runs against a throwaway embedded SQLite database;
+the repository itself is the ``app`` package, so it is registered under that
+name when the checkout directory is called something else.
+"""
+import importlib.util
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+TEST_DIR = tempfile.mkdtemp(prefix="tomolink-tests-")
+# Always overridden: the suite writes users, imports and tokens, never into a developer's database
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/tomolink.db"
+os.environ["REPLICA_DATABASE_URLS"] = ""
+os.environ["PROFILE_DIR"] = os.path.join(TEST_DIR, "profiles")
+
+if "app" not in sys.modules:
+    spec = importlib.util.spec_from_file_location("app", ROOT / "__init__.py", submodule_search_locations=[str(ROOT)])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["app"] = package
+    spec.loader.exec_module(package)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app as api  # noqa: E402
+from app.core.auth import create_access_token, hash_password  # noqa: E402
+from app.db.database import ReadSessionLocal, SessionLocal, engine  # noqa: E402
+from app.models.game_profile import GameProfile  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+PASSWORD = "password123"
+_PASSWORD_HASH = hash_password(PASSWORD)
+_user_seq = itertools.count(1)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Not used as a context manager: the background job runner stays off
+    return TestClient(api)
+
+
+@pytest.fixture
+def db():
+    # Read session for assertions: a SessionLocal would hold SQLite's write lock while the test runs
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user():
+    """Create a user; returns (user_id, auth headers)."""
+    def _make_user(superuser: bool = False, **fields):
+        n = next(_user_seq)
+        session = SessionLocal()
+        try:
+            user = User(username=f"user{n}", email=f"user{n}@example.com", hashed_password=_PASSWORD_HASH,
+                        is_superuser=superuser, **fields)
+            session.add(user)
+            session.commit()
+            user_id = user.id
+        finally:
+            session.close()
+        return user_id, {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    return _make_user
+
+
+@pytest.fixture
+def make_game_profile():
+    def _make_game_profile(user_id: int, game_type: str, **fields):
+        values = dict(playstyle="casual", communication_preference="voice", role_preference="dps", rank="gold")
+        values.update(fields)
+        session = SessionLocal()
+        try:
+            session.add(GameProfile(user_id=user_id, game_type=game_type, **values))
+            session.commit()
+        finally:
+            session.close()
+    return _make_game_profile
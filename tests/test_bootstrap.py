@@ -0,0 +1,25 @@
+# tests/test_bootstrap.py
+from app.db.database import engine
+from app.routers import bootstrap
+
+
+def test_bootstrap_returns_every_section(client, make_user):
+    _, headers = make_user()
+    response = client.get("/bootstrap", headers=headers)
+    assert response.status_code == 200
+    assert set(response.json()) == {"me", *bootstrap.SECTIONS}
+
+
+def test_sections_do_not_hold_the_auth_connection(client, make_user, monkeypatch):
+    _, headers = make_user()
+    checked_out = []
+    stats = bootstrap.SECTIONS["stats"]
+
+    def counting_stats(db, current_user):
+        result = stats(db, current_user)
+        checked_out.append(engine.pool.checkedout())
+        return result
+
+    monkeypatch.setitem(bootstrap.SECTIONS, "stats", counting_stats)
+    assert client.get("/bootstrap", params={"include": "stats"}, headers=headers).status_code == 200
+    assert checked_out == [1]  # only the section's own session
@@ -0,0 +1,132 @@
+# tests/test_bulk_import.py
+import io
+import itertools
+import json
+
+from sqlalchemy import or_
+
+from app.core.auth import hash_password, verify_password
+from app.core.bulk_import import import_file, import_records
+from app.db.database import SessionLocal
+from app.db.functions import insert_ignore
+from app.models.friend import FriendRequest, Friendship
+from app.models.user import User
+
+
+_batch = itertools.count(1)
+HASHED = hash_password("imported-secret")
+
+
+def _import(text, fmt):
+    writer = SessionLocal()
+    try:
+        return import_file(writer, io.StringIO(text), fmt)
+    finally:
+        writer.close()
+
+
+def _username(db, user_id):
+    return db.get(User, user_id).username
+
+
+def _import_friends(*edges):
+    writer = SessionLocal()
+    try:
+        records = [(line, "friend", {"from_username": a, "to_username": b, "status": status})
+                   for line, (a, b, status) in enumerate(edges, start=1)]
+        return import_records(writer, records)
+    finally:
+        writer.close()
+
+
+def _friendships(db, *user_ids):
+    db.rollback()  # fresh read snapshot
+    return set(db.query(Friendship.user_id, Friendship.friend_id)
+               .filter(or_(Friendship.user_id.in_(user_ids), Friendship.friend_id.in_(user_ids))).all())
+
+
+def test_existing_reverse_request_is_reported_not_befriended(client, make_user, db):
+    alice_id, _ = make_user()
+    bob_id, bob_headers = make_user()
+    assert client.post(f"/friends/requests/{alice_id}", headers=bob_headers).status_code == 201
+    alice, bob = _username(db, alice_id), _username(db, bob_id)
+
+    report = _import_friends((alice, bob, "accepted"))
+    assert report["friend_requests_created"] == 0
+    assert [error["line"] for error in report["errors"]] == [1]
+    assert _friendships(db, alice_id, bob_id) == set()
+
+
+def test_duplicate_edges_in_one_batch_keep_the_first(make_user, db):
+    alice_id, _ = make_user()
+    bob_id, _ = make_user()
+    alice, bob = _username(db, alice_id), _username(db, bob_id)
+
+    report = _import_friends((alice, bob, "accepted"), (bob, alice, "pending"))
+    assert report["friend_requests_created"] == 1
+    assert [error["line"] for error in report["errors"]] == [2]
+    assert _friendships(db, alice_id, bob_id) == {(alice_id, bob_id), (bob_id, alice_id)}
+
+
+def test_accept_is_idempotent_when_friendship_rows_exist(client, make_user, db):
+    alice_id, alice_headers = make_user()
+    bob_id, bob_headers = make_user()
+    request_id = client.post(f"/friends/requests/{alice_id}", headers=bob_headers).json()["id"]
+    writer = SessionLocal()
+    try:
+        writer.execute(insert_ignore(writer, Friendship), Friendship.pair(alice_id, bob_id))
+        writer.commit()
+    finally:
+        writer.close()
+
+    response = client.post(f"/friends/requests/{request_id}/accept", headers=alice_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "accepted"
+    assert db.get(FriendRequest, request_id).status == "accepted"
+    assert _friendships(db, alice_id, bob_id) == {(alice_id, bob_id), (bob_id, alice_id)}
+
+
+def test_user_duplicates_in_batch_and_in_database(make_user, db):
+    existing_id, _ = make_user()
+    existing = db.get(User, existing_id)
+    n = next(_batch)
+    records = [
+        {"username": f"imp{n}", "email": f"imp{n}@example.com", "hashed_password": HASHED},
+        {"username": f"imp{n}", "email": f"imp{n}-other@example.com", "hashed_password": HASHED},
+        {"username": f"imp{n}-other", "email": f"imp{n}@example.com", "hashed_password": HASHED},
+        {"username": existing.username, "email": f"imp{n}-taken-name@example.com", "hashed_password": HASHED},
+        {"username": f"imp{n}-taken-email", "email": existing.email, "hashed_password": HASHED},
+    ]
+    report = _import("\n".join(json.dumps({"type": "user", **record}) for record in records), "jsonl")
+
+    assert report["users_created"] == 1
+    errors = {error["line"]: error["error"] for error in report["errors"]}
+    assert sorted(errors) == [2, 3, 4, 5]
+    assert "within import" in errors[2] and "within import" in errors[3]
+    assert "already registered" in errors[4] and "already registered" in errors[5]
+    db.rollback()
+    assert db.query(User).filter(User.username.like(f"imp{n}%")).count() == 1
+
+
+def test_csv_users_with_plaintext_and_prehashed_passwords(db):
+    n = next(_batch)
+    rows = [
+        "username,email,password,hashed_password,platform,region,games",
+        f"csv{n}a,csv{n}a@example.com,plain-secret,,PC,EU,Valorant; Overwatch ;",
+        f"csv{n}b,csv{n}b@example.com,,{HASHED},,,",
+        f"csv{n}c,csv{n}c@example.com,,not-a-bcrypt-hash,,,",
+        f"csv{n}d,csv{n}d@example.com,,,,,",
+    ]
+    report = _import("\n".join(rows) + "\n", "csv")
+
+    assert report["users_created"] == 2
+    assert [error["line"] for error in report["errors"]] == [4, 5]  # header is line 1
+    db.rollback()
+    plain = db.query(User).filter(User.username == f"csv{n}a").one()
+    prehashed = db.query(User).filter(User.username == f"csv{n}b").one()
+    assert plain.games == ["Valorant", "Overwatch"]
+    assert (plain.platform, plain.region) == ("PC", "EU")
+    assert plain.hashed_password != "plain-secret"
+    assert verify_password("plain-secret", plain.hashed_password)
+    assert prehashed.hashed_password == HASHED
+    assert prehashed.games is None
@@ -0,0 +1,109 @@
+# tests/test_feature_snapshot.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from app.core import feature_snapshot
+from app.core.feature_snapshot import FeatureSnapshot, refresh_snapshot, run_writer
+from app.db.database import SessionLocal
+from app.models.user import upgrade_users_table
+
+# users as created by the release before updated_at/version existed
+BASELINE_USERS_DDL = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY, username VARCHAR NOT NULL UNIQUE, email VARCHAR NOT NULL UNIQUE,
+    hashed_password VARCHAR NOT NULL, is_active BOOLEAN, is_superuser BOOLEAN, quiz_answers JSON,
+    platform VARCHAR, region VARCHAR, games JSON, is_private BOOLEAN, feedback_score INTEGER,
+    feedback_count INTEGER, overwatch_role VARCHAR
+)
+"""
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/baseline.db")
+    with engine.begin() as conn:
+        conn.execute(text(BASELINE_USERS_DDL))
+        conn.execute(text(
+            "INSERT INTO users (id, username, email, hashed_password, platform, games, feedback_score) "
+            "VALUES (1, 'old', 'old@example.com', 'x', 'PC', '[\"Valorant\"]', 10)"
+        ))
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_adds_columns_and_backfills(baseline_engine, tmp_path):
+    upgrade_users_table(baseline_engine)
+    upgrade_users_table(baseline_engine)  # idempotent
+
+    columns = {c["name"] for c in inspect(baseline_engine).get_columns("users")}
+    assert {"updated_at", "version"} <= columns
+    assert "ix_users_updated_at" in {i["name"] for i in inspect(baseline_engine).get_indexes("users")}
+    with baseline_engine.connect() as conn:
+        version, updated_at = conn.execute(text("SELECT version, updated_at FROM users")).one()
+    assert version == 1
+    assert updated_at is not None
+
+    with Session(bind=baseline_engine) as db:
+        refresh_snapshot(db, str(tmp_path / "features.snap"))
+    assert FeatureSnapshot(str(tmp_path / "features.snap")).get(1).platform == "PC"
+
+
+def test_refresh_picks_up_rows_committed_behind_the_watermark(baseline_engine, tmp_path):
+    upgrade_users_table(baseline_engine)
+    path = str(tmp_path / "features.snap")
+    with Session(bind=baseline_engine) as db:
+        refresh_snapshot(db, path)
+    watermark = FeatureSnapshot(path).watermark
+
+    # A transaction that started before the last refresh but committed after it
+    late = datetime.fromtimestamp(watermark, tz=timezone.utc) - timedelta(seconds=5)
+    with baseline_engine.begin() as conn:
+        conn.execute(text("UPDATE users SET platform = 'Xbox', updated_at = :ts WHERE id = 1"),
+                     {"ts": late.replace(tzinfo=None)})
+    with Session(bind=baseline_engine) as db:
+        refresh_snapshot(db, path)
+    assert FeatureSnapshot(path).get(1).platform == "Xbox"
+
+
+def test_writer_survives_a_failed_refresh(monkeypatch, tmp_path):
+    class Stop(BaseException):
+        pass
+
+    calls = []
+
+    def flaky_refresh(db, path):
+        calls.append(path)
+        if len(calls) == 1:
+            raise RuntimeError("database went away")
+        raise Stop()
+
+    monkeypatch.setattr(feature_snapshot, "refresh_snapshot", flaky_refresh)
+    with pytest.raises(Stop):
+        run_writer(str(tmp_path / "features.snap"), interval=0)
+    assert len(calls) == 2
+
+
+def test_suggestions_score_from_snapshot(client, db, make_user, monkeypatch, tmp_path):
+    path = str(tmp_path / "features.snap")
+    monkeypatch.setattr(feature_snapshot, "SNAPSHOT_PATH", path)
+    monkeypatch.setattr(feature_snapshot, "_current", None)
+    _, headers = make_user(platform="Switch", region="OCE")
+    candidate_id, _ = make_user(platform="Switch", region="OCE", feedback_score=40)
+    refresh_snapshot(db, path)
+
+    # Not visible to the scorer until the next snapshot refresh
+    writer = SessionLocal()
+    writer.execute(text("UPDATE users SET feedback_score = 90 WHERE id = :id"), {"id": candidate_id})
+    writer.commit()
+    writer.close()
+
+    response = client.get("/suggestions/", params={"platform": "Switch", "region": "OCE"}, headers=headers)
+    assert response.status_code == 200
+    scores = {s["id"]: s["score"] for s in response.json()}
+    assert scores[candidate_id] == 20 + 20 + 40
+
+    quiz = client.get("/quiz/suggestions", params={"platform": "Switch", "region": "OCE"}, headers=headers)
+    assert {s["id"]: s["username"] for s in quiz.json()}[candidate_id].startswith("user")
@@ -0,0 +1,190 @@
+# tests/test_jobs.py
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import or_
+
+from app.core import jobs
+from app.core.auth import issue_refresh_token
+from app.core.jobs import claim_next_job, enqueue, job_handler, run_job
+from app.db.database import SessionLocal
+from app.models.friend import FriendRequest, Friendship
+from app.models.game_profile import GameProfile
+from app.models.job import Job
+from app.models.lfg import LFGPost
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.routers import user as user_router
+
+calls = []
+
+
+@job_handler("test_chunked")
+def _chunked(db, payload):
+    calls.append(payload["chunks"])
+    return len(calls) >= payload["chunks"]
+
+
+@job_handler("test_failing")
+def _failing(db, payload):
+    raise ValueError("boom")
+
+
+@pytest.fixture(autouse=True)
+def idle_queue():
+    # Park jobs left behind by other tests so the claims below only see this test's jobs
+    session = SessionLocal()
+    try:
+        session.query(Job).filter(Job.status.in_(("queued", "running")))\
+               .update({"status": "failed"}, synchronize_session=False)
+        session.commit()
+    finally:
+        session.close()
+    calls.clear()
+
+
+def _enqueue(kind, payload=None, **kwargs) -> int:
+    session = SessionLocal()
+    try:
+        job = enqueue(session, kind, payload, **kwargs)
+        session.commit()
+        return job.id
+    finally:
+        session.close()
+
+
+def _claim_and_run():
+    """One runner iteration; returns (job id, status) of the job it ran, or None."""
+    session = SessionLocal()
+    try:
+        job = claim_next_job(session)
+        if job is None:
+            return None
+        run_job(session, job)
+        return job.id, job.status
+    finally:
+        session.close()
+
+
+def _job(job_id) -> Job:
+    session = SessionLocal()
+    try:
+        job = session.get(Job, job_id)
+        session.expunge(job)
+        return job
+    finally:
+        session.close()
+
+
+def _seconds_from_now(moment: datetime) -> float:
+    if moment.tzinfo is None:  # SQLite hands back naive UTC
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - datetime.now(timezone.utc)).total_seconds()
+
+
+def test_claim_leases_the_job_once():
+    job_id = _enqueue("test_chunked", {"chunks": 1})
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        claimed = claim_next_job(first)
+        assert claimed.id == job_id and claimed.status == "running"
+        assert _seconds_from_now(claimed.locked_until) > jobs.JOB_LEASE_SECONDS - 60
+        first.commit()
+        assert claim_next_job(second) is None
+    finally:
+        first.close()
+        second.close()
+
+
+def test_chunked_job_is_requeued_until_done():
+    job_id = _enqueue("test_chunked", {"chunks": 3})
+    assert _claim_and_run() == (job_id, "queued")
+    assert _claim_and_run() == (job_id, "queued")
+    assert _claim_and_run() == (job_id, "succeeded")
+    assert _claim_and_run() is None
+    job = _job(job_id)
+    assert len(calls) == 3 and job.attempts == 0 and job.locked_until is None
+
+
+def test_failures_back_off_then_fail_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_RETRY_BASE_SECONDS", 100)
+    job_id = _enqueue("test_failing", max_attempts=3)
+    session = SessionLocal()
+    try:
+        job = claim_next_job(session)
+        delays = []
+        for _ in range(2):
+            run_job(session, job)
+            assert job.status == "queued" and "boom" in job.last_error
+            delays.append(_seconds_from_now(job.run_after))
+        run_job(session, job)
+        assert (job.status, job.attempts) == ("failed", 3)
+    finally:
+        session.close()
+    assert 90 < delays[0] <= 100 and 190 < delays[1] <= 200  # base * 2 ** (attempt - 1)
+    assert _claim_and_run() is None  # backing off, then failed: never claimed again
+    assert _job(job_id).status == "failed"
+
+
+def test_requester_follows_their_deletion_job(client, make_user):
+    _, headers = make_user()
+    _, other_headers = make_user()
+    _, admin_headers = make_user(superuser=True)
+    job_id = client.delete("/user/delete", headers=headers).json()["job_id"]
+
+    assert client.get("/auth/me", headers=headers).status_code == 401  # deactivated
+    response = client.get(f"/jobs/{job_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["kind"] == "delete_account"
+    assert client.get(f"/jobs/{job_id}", headers=other_headers).status_code == 404
+    assert client.get(f"/jobs/{job_id}", headers=admin_headers).status_code == 200
+
+    while _claim_and_run() is not None:
+        pass
+    # Still visible once the account row itself is gone
+    assert client.get(f"/jobs/{job_id}", headers=headers).json()["status"] == "succeeded"
+
+
+def test_delete_account_job_removes_everything(client, make_user, make_game_profile, monkeypatch):
+    monkeypatch.setattr(user_router, "DELETE_CHUNK_SIZE", 1)
+    user_id, headers = make_user()
+    friend_id, friend_headers = make_user()
+    other_id, other_headers = make_user()
+    request_id = client.post(f"/friends/requests/{friend_id}", headers=headers).json()["id"]
+    assert client.post(f"/friends/requests/{request_id}/accept", headers=friend_headers).status_code == 200
+    assert client.post(f"/friends/requests/{user_id}", headers=other_headers).status_code == 201
+    for i in range(2):
+        assert client.post("/lfg", json={"content": f"post {i}", "game": "Valorant"}, headers=headers).status_code == 201
+    make_game_profile(user_id, "Valorant")
+    make_game_profile(user_id, "Overwatch")
+    session = SessionLocal()
+    try:
+        issue_refresh_token(session, user_id)
+        session.commit()
+    finally:
+        session.close()
+
+    job_id = client.delete("/user/delete", headers=headers).json()["job_id"]
+    runs = 0
+    while _claim_and_run() is not None:
+        runs += 1
+    assert _job(job_id).status == "succeeded"
+    assert runs > 5  # one chunk per run
+
+    session = SessionLocal()
+    try:
+        leftovers = {
+            model.__name__: session.query(model).filter(criteria).count()
+            for model, criteria in (
+                (Friendship, or_(Friendship.user_id == user_id, Friendship.friend_id == user_id)),
+                (FriendRequest, or_(FriendRequest.from_user_id == user_id, FriendRequest.to_user_id == user_id)),
+                (LFGPost, LFGPost.user_id == user_id),
+                (GameProfile, GameProfile.user_id == user_id),
+                (RefreshToken, RefreshToken.user_id == user_id),
+                (User, User.id == user_id),
+            )
+        }
+        assert session.get(User, friend_id) is not None
+    finally:
+        session.close()
+    assert leftovers == dict.fromkeys(leftovers, 0)
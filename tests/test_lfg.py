@@ -0,0 +1,98 @@
+# tests/test_lfg.py
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.database import SessionLocal
+from app.models.lfg import LFGPost, ensure_lfg_search_index
+
+# lfg_posts as created by the release before game tags / search existed
+BASELINE_LFG_DDL = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR NOT NULL)",
+    "CREATE TABLE lfg_posts (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users (id) ON DELETE CASCADE, "
+    "content VARCHAR NOT NULL, created_at DATETIME DEFAULT (CURRENT_TIMESTAMP))",
+    "INSERT INTO users (id, username) VALUES (1, 'old')",
+    "INSERT INTO lfg_posts (id, user_id, content) VALUES (1, 1, 'looking for a duo tonight')",
+]
+
+
+def test_search_index_upgrades_a_baseline_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/baseline.db")
+    with engine.begin() as conn:
+        for statement in BASELINE_LFG_DDL:
+            conn.execute(text(statement))
+
+    ensure_lfg_search_index(engine)
+    ensure_lfg_search_index(engine)  # idempotent
+
+    assert {"game", "updated_at"} <= {c["name"] for c in inspect(engine).get_columns("lfg_posts")}
+    assert "ix_lfg_posts_updated_at" in {i["name"] for i in inspect(engine).get_indexes("lfg_posts")}
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO lfg_posts (user_id, content, game) VALUES (1, 'ranked grind', 'Valorant')"))
+        old = conn.execute(text("SELECT rowid FROM lfg_posts_fts WHERE lfg_posts_fts MATCH 'duo'")).scalars().all()
+        tagged = conn.execute(text("SELECT rowid FROM lfg_posts_fts WHERE lfg_posts_fts MATCH 'valorant'")).scalars().all()
+        backfilled = conn.execute(text("SELECT updated_at = created_at FROM lfg_posts WHERE id = 1")).scalar()
+    assert old == [1]
+    assert tagged == [2]
+    assert backfilled == 1
+    engine.dispose()
+
+
+def test_feed_etag_is_per_representation(client, make_user):
+    _, headers = make_user()
+    assert client.post("/lfg", json={"content": "etag check", "game": "Valorant"}, headers=headers).status_code == 201
+
+    as_json = client.get("/lfg", headers=headers)
+    as_ndjson = client.get("/lfg", headers={**headers, "Accept": "application/x-ndjson"})
+    assert "Accept" in as_json.headers["Vary"]
+    assert "Accept" in as_ndjson.headers["Vary"]
+    assert as_json.headers["ETag"] != as_ndjson.headers["ETag"]
+
+    # A cached JSON body must not satisfy a request for NDJSON (and vice versa)
+    cross = client.get("/lfg", headers={**headers, "Accept": "application/x-ndjson",
+                                        "If-None-Match": as_json.headers["ETag"]})
+    assert cross.status_code == 200
+    same = client.get("/lfg", headers={**headers, "If-None-Match": as_json.headers["ETag"]})
+    assert same.status_code == 304
+
+
+def test_feed_etag_changes_when_a_post_is_edited(client, make_user):
+    _, headers = make_user()
+    post_id = client.post("/lfg", json={"content": "before edit"}, headers=headers).json()["id"]
+    before = client.get("/lfg", headers=headers).headers["ETag"]
+
+    writer = SessionLocal()
+    try:
+        writer.get(LFGPost, post_id).content = "after edit"
+        writer.commit()
+    finally:
+        writer.close()
+    assert client.get("/lfg", headers=headers).headers["ETag"] != before
+
+
+def test_feed_etag_changes_on_delete(client, make_user):
+    _, headers = make_user()
+    post_id = client.post("/lfg", json={"content": "to be deleted"}, headers=headers).json()["id"]
+    before = client.get("/lfg", headers=headers).headers["ETag"]
+    assert client.delete(f"/lfg/{post_id}", headers=headers).status_code == 204
+    assert client.get("/lfg", headers=headers).headers["ETag"] != before
+
+
+def test_concurrent_edits_do_not_raise_stale_data(make_user):
+    user_id, _ = make_user()
+    writer = SessionLocal()
+    post = LFGPost(user_id=user_id, content="shared")
+    writer.add(post)
+    writer.commit()
+    post_id = post.id
+    writer.close()
+
+    first, second = SessionLocal(expire_on_commit=False), SessionLocal()
+    try:
+        first_copy = first.get(LFGPost, post_id)
+        first.commit()  # release the write lock, keep the loaded (soon stale) state
+        second.get(LFGPost, post_id).content = "edited by second"
+        second.commit()
+        first_copy.game = "Valorant"  # no optimistic locking: last writer wins, no StaleDataError
+        first.commit()
+    finally:
+        first.close()
+        second.close()
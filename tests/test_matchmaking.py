@@ -0,0 +1,21 @@
+# tests/test_matchmaking.py
+
+
+def test_party_includes_unranked_profiles(client, make_user, make_game_profile):
+    game = "party-unranked"
+    user_id, headers = make_user()
+    make_game_profile(user_id, game)
+    ranked_id, _ = make_user()
+    make_game_profile(ranked_id, game, rank="gold")
+    unranked_id, _ = make_user()
+    make_game_profile(unranked_id, game, rank=None)
+
+    response = client.post(f"/matchmaking/{game}/party", params={"size": 3}, headers=headers)
+    assert response.status_code == 200
+    members = {m["user_id"]: m for m in response.json()["members"]}
+    assert set(members) == {ranked_id, unranked_id}
+    assert members[unranked_id]["rank"] is None
+
+    matches = client.post(f"/matchmaking/{game}", headers=headers)
+    assert matches.status_code == 200
+    assert {m["user_id"] for m in matches.json()} == {ranked_id, unranked_id}
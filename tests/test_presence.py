@@ -0,0 +1,45 @@
+# tests/test_presence.py
+import sys
+import threading
+
+from app.core.presence import PresenceRegistry
+
+
+def test_touch_while_listing_online_ids():
+    registry = PresenceRegistry()  # entries stay, so each online_ids() walks a growing dict
+    errors = []
+    done = threading.Event()
+
+    def toucher():
+        for user_id in range(50_000):
+            registry.touch(user_id)
+        done.set()
+
+    def lister():
+        try:
+            while not done.is_set():
+                registry.online_ids()
+        except RuntimeError as exc:  # dictionary changed size during iteration
+            errors.append(exc)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often enough to interleave with the iteration
+    try:
+        threads = [threading.Thread(target=toucher), threading.Thread(target=lister)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+
+def test_connection_keeps_user_online_until_last_disconnect():
+    registry = PresenceRegistry(ttl=0)
+    registry.connect(1)
+    registry.connect(1)
+    registry.disconnect(1)
+    assert registry.online_ids() == {1}
+    registry.disconnect(1)
+    assert registry.online_ids() == set()
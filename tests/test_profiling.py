@@ -0,0 +1,114 @@
+# tests/test_profiling.py
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiling import (
+    PROFILE_HEADER, ProfilingMiddleware, StackSampler, _profile_threads, instrument_sync_calls, load_profile,
+    sampled_in_thread,
+)
+
+
+def test_profiled_request_sets_headers_and_stores_profile(client, make_user):
+    _, headers = make_user(superuser=True)
+    response = client.get("/auth/me", headers={**headers, PROFILE_HEADER: "1"})
+    assert response.status_code == 200
+    assert "total;dur=" in response.headers["Server-Timing"]
+    profile_id = response.headers["X-Profile-Id"]
+
+    stored = client.get(f"/debug/profiles/{profile_id}", headers=headers)
+    assert stored.status_code == 200
+    assert stored.json()["status_code"] == 200
+    assert stored.json()["sql"], "the auth lookup should have been captured"
+
+
+def test_profile_header_ignored_for_regular_users(client, make_user):
+    _, headers = make_user()
+    response = client.get("/auth/me", headers={**headers, PROFILE_HEADER: "1"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+
+
+def _busy_loop(stop):
+    # Runs app-looking code from this test module; it must not show up in another thread's profile
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_only_samples_registered_threads():
+    stop = threading.Event()
+    other = threading.Thread(target=_busy_loop, args=(stop,))
+    other.start()
+    sampler = StackSampler({threading.get_ident()}, interval=0.001)
+    sampler.start()
+    try:
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+    finally:
+        sampler.stop()
+        stop.set()
+        other.join()
+    assert sampler.samples, "the registered thread should have been sampled"
+    assert not any("_busy_loop" in stack for stack in sampler.samples)
+    assert not any("_run (core/profiling.py" in stack for stack in sampler.samples)
+
+
+def _burn(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def _loop_work():
+    _burn(0.03)
+
+
+def _endpoint_work():
+    _burn(0.03)
+
+
+def _profiled_app():
+    mini = FastAPI()
+
+    @mini.middleware("http")
+    async def busy_on_the_loop(request, call_next):
+        _loop_work()  # event loop thread: shared by every request, must not be sampled
+        return await call_next(request)
+
+    @mini.get("/work")
+    def work():
+        _endpoint_work()  # no SQL at all: the worker thread is still sampled from the start
+        return {}
+
+    mini.add_middleware(ProfilingMiddleware)
+    instrument_sync_calls(mini)
+    return TestClient(mini)
+
+
+def test_profile_covers_sync_work_and_not_the_event_loop(make_user):
+    _, headers = make_user(superuser=True)
+    response = _profiled_app().get("/work", headers={**headers, PROFILE_HEADER: "1"})
+    stacks = load_profile(response.headers["X-Profile-Id"])["folded"]
+    assert any("_endpoint_work" in stack for stack in stacks)
+    assert not any("_loop_work" in stack for stack in stacks)
+
+
+def test_thread_leaves_the_sampled_set_when_the_call_ends():
+    seen = []
+    threads = set()
+
+    @sampled_in_thread
+    def call():
+        seen.append(threading.get_ident() in threads)
+
+    call()  # not profiling: no-op
+    token = _profile_threads.set(threads)
+    try:
+        call()
+    finally:
+        _profile_threads.reset(token)
+    assert seen == [False, True]
+    assert threads == set()
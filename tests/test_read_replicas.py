@@ -0,0 +1,58 @@
+# tests/test_read_replicas.py
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.db import database
+from app.db.database import Base, ReplicaPool
+from app.core.read_your_writes import PRIMARY_PIN_COOKIE
+from app.main import app as api
+
+EDIT = {"platform": "PC", "region": "EU", "games": ["Valorant"]}
+
+
+@pytest.fixture
+def stale_replica(monkeypatch, tmp_path):
+    # An empty replica: anything read from it instead of the primary is visibly missing
+    replica = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    Base.metadata.create_all(bind=replica)
+    monkeypatch.setattr(database, "replica_engines", [replica])
+    monkeypatch.setattr(database, "replicas", ReplicaPool([replica]))
+    yield replica
+    replica.dispose()
+
+
+def test_reads_stay_on_primary_after_a_write_on_any_worker(make_user, stale_replica):
+    _, headers = make_user()
+    client = TestClient(api)
+    assert client.get("/dashboard/stats", headers=headers).status_code == 404  # served by the replica
+
+    response = client.put("/user/profile/edit", json=EDIT, headers=headers)
+    assert response.status_code == 200
+    pin = response.cookies[PRIMARY_PIN_COOKIE]
+
+    # No server-side state is involved: a client presenting the cookie is pinned anywhere
+    other_worker = TestClient(api, cookies={PRIMARY_PIN_COOKIE: pin})
+    assert other_worker.get("/dashboard/stats", headers=headers).status_code == 200
+
+
+def test_expired_pin_reads_from_replica(make_user, stale_replica):
+    _, headers = make_user()
+    client = TestClient(api, cookies={PRIMARY_PIN_COOKIE: f"{time.time() - 1:.3f}"})
+    assert client.get("/dashboard/stats", headers=headers).status_code == 404
+
+
+def test_reads_without_writes_are_not_pinned(make_user, stale_replica):
+    _, headers = make_user()
+    client = TestClient(api)
+    response = client.get("/dashboard/stats", headers=headers)
+    assert PRIMARY_PIN_COOKIE not in response.cookies
+
+
+def test_login_right_after_signup_ignores_replica_lag(stale_replica):
+    credentials = {"username": "fresh@example.com", "password": "password123"}
+    assert TestClient(api).post("/auth/signup", json={"email": credentials["username"], **credentials}).status_code == 201
+    # No pin cookie sent back (API client): the lookup must still hit the primary
+    assert TestClient(api).post("/auth/login/json", json=credentials).status_code == 200
@@ -0,0 +1,86 @@
+# tests/test_refresh_tokens.py
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.core import auth
+from app.db.database import SessionLocal
+from app.main import app as api
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from conftest import PASSWORD
+
+
+def _login(client, db, user_id) -> str:
+    username = db.get(User, user_id).username
+    response = client.post("/auth/login", data={"username": username, "password": PASSWORD})
+    assert response.status_code == 200
+    return response.json()["refresh_token"]
+
+
+def test_refresh_rotates_and_detects_reuse(client, db, make_user):
+    user_id, _ = make_user()
+    first = _login(client, db, user_id)
+    rotated = client.post("/auth/refresh", json={"refresh_token": first})
+    assert rotated.status_code == 200
+
+    reused = client.post("/auth/refresh", json={"refresh_token": first})
+    assert reused.status_code == 401
+    # Reuse revokes the whole family, including the token minted by the rotation
+    assert client.post("/auth/refresh", json={"refresh_token": rotated.json()["refresh_token"]}).status_code == 401
+
+
+def test_concurrent_refreshes_mint_at_most_one_live_token(client, db, make_user):
+    user_id, _ = make_user()
+    for _ in range(5):
+        token = _login(client, db, user_id)
+        db.rollback()  # end the read snapshot so the new token is visible
+        family_id = db.query(RefreshToken.family_id).filter(RefreshToken.user_id == user_id)\
+                      .order_by(RefreshToken.id.desc()).first()[0]
+        barrier = threading.Barrier(2)
+        statuses = []
+
+        def refresh():
+            racer = TestClient(api)
+            barrier.wait()
+            statuses.append(racer.post("/auth/refresh", json={"refresh_token": token}).status_code)
+
+        threads = [threading.Thread(target=refresh) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(statuses) != [200, 200]
+        assert all(code in (200, 401) for code in statuses)
+        db.rollback()
+        live = db.query(RefreshToken).filter(RefreshToken.family_id == family_id,
+                                             RefreshToken.revoked_at.is_(None)).count()
+        assert live <= 1
+
+
+def test_token_rotated_between_read_and_revoke_counts_as_reuse(client, db, make_user, monkeypatch):
+    user_id, _ = make_user()
+    token = _login(client, db, user_id)
+    real_get_user = auth.get_user
+
+    def racing_get_user(session, uid):
+        # Another request revokes (rotates) the same token after this one has read it
+        session.execute(update(RefreshToken).where(RefreshToken.token_hash == auth._hash_refresh_token(token))
+                        .values(revoked_at=datetime.now(timezone.utc)))
+        return real_get_user(session, uid)
+
+    monkeypatch.setattr(auth, "get_user", racing_get_user)
+    session = SessionLocal()
+    try:
+        with pytest.raises(HTTPException) as exc:
+            auth.rotate_refresh_token(session, token)
+    finally:
+        session.close()
+    assert exc.value.detail == "Refresh token reuse detected"
+    db.rollback()
+    assert db.query(RefreshToken).filter(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None)).count() == 0
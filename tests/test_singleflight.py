@@ -0,0 +1,129 @@
+# tests/test_singleflight.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core import singleflight
+from app.core.singleflight import SingleFlight, single_flight, single_flight_stats
+
+CALLERS = 8
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _run_concurrently(group, fn):
+    """CALLERS threads call group.do("key", fn) while fn is held open; returns their outcomes."""
+    release = threading.Event()
+    runs = []
+
+    def held():
+        runs.append(threading.get_ident())
+        release.wait()
+        return fn()
+
+    def call():
+        try:
+            return group.do("key", held)
+        except Exception as exc:
+            return exc
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        futures = [pool.submit(call) for _ in range(CALLERS)]
+        _wait_for(lambda: group.calls == CALLERS)  # everyone is in: one leader, the rest waiting
+        release.set()
+        outcomes = [future.result() for future in futures]
+    return runs, outcomes
+
+
+def test_concurrent_callers_share_one_execution():
+    group = SingleFlight("test.shared")
+    result = object()
+    runs, outcomes = _run_concurrently(group, lambda: result)
+    assert len(runs) == 1
+    assert all(outcome is result for outcome in outcomes)
+    assert (group.executed, group.coalesced) == (1, CALLERS - 1)
+
+
+def test_leader_error_reaches_every_waiter_and_is_not_cached():
+    group = SingleFlight("test.error", ttl=60)
+    error = ValueError("backend down")
+
+    def fail():
+        raise error
+
+    runs, outcomes = _run_concurrently(group, fail)
+    assert len(runs) == 1
+    assert all(outcome is error for outcome in outcomes)
+    assert group.do("key", lambda: "recovered") == "recovered"  # ran again, nothing cached
+    assert group.executed == 2 and group.cache_hits == 0
+
+
+def test_result_is_reused_until_the_ttl_expires(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(singleflight, "time", clock)
+    group = SingleFlight("test.ttl", ttl=10)
+    values = iter(["first", "second"])
+
+    assert group.do("key", lambda: next(values)) == "first"
+    clock.now += 9.9
+    assert group.do("key", lambda: next(values)) == "first"
+    assert group.do("other", lambda: "other key") == "other key"
+    clock.now += 0.2
+    assert group.do("key", lambda: next(values)) == "second"
+    assert (group.executed, group.cache_hits) == (3, 1)
+
+
+def test_without_ttl_nothing_is_reused():
+    group = SingleFlight("test.no_ttl")
+    assert group.do("key", lambda: 1) == 1
+    assert group.do("key", lambda: 2) == 2
+    assert group.cache_hits == 0
+
+
+def test_stats_counters_and_hit_rate():
+    assert SingleFlight("test.empty").stats()["hit_rate"] == 0.0
+
+    group = SingleFlight("test.stats", ttl=60)
+    _run_concurrently(group, lambda: "value")  # 1 executed, CALLERS - 1 coalesced
+    group.do("key", lambda: pytest.fail("should be cached"))
+    group.do("key", lambda: pytest.fail("should be cached"))
+
+    calls = CALLERS + 2
+    assert group.stats() == {
+        "calls": calls,
+        "executed": 1,
+        "coalesced": CALLERS - 1,
+        "cache_hits": 2,
+        "hit_rate": round((CALLERS - 1 + 2) / calls, 4),
+        "ttl_seconds": 60,
+    }
+
+
+def test_decorator_keys_calls_without_the_session():
+    executed = []
+
+    @single_flight("test.decorator", key=lambda db, game: game, ttl=60)
+    def lookup(db, game):
+        executed.append(game)
+        return game.upper()
+
+    assert lookup("session-1", "valorant") == "VALORANT"
+    assert lookup("session-2", "valorant") == "VALORANT"  # different session, same key
+    assert lookup("session-2", "overwatch") == "OVERWATCH"
+    assert executed == ["valorant", "overwatch"]
+    assert single_flight_stats()["test.decorator"]["cache_hits"] == 1
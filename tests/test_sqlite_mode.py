@@ -0,0 +1,87 @@
+# tests/test_sqlite_mode.py
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, update
+
+from app.core.jobs import claim_next_job
+from app.db.database import ReadSessionLocal, SessionLocal
+from app.main import app as api
+from app.models.job import Job
+from app.models.lfg import LFGPost
+from app.models.user import User
+
+CLIENTS = 30
+WRITES_PER_CLIENT = 5
+
+
+def test_closing_another_session_keeps_flushed_writes(make_user):
+    user_id, _ = make_user()
+    writer = SessionLocal()
+    writer.add(LFGPost(user_id=user_id, content="flushed, not yet committed", game="Valorant"))
+    writer.flush()
+
+    reader = ReadSessionLocal()
+    reader.query(User).count()
+    reader.close()
+
+    writer.commit()
+    writer.close()
+    check = SessionLocal()
+    try:
+        assert check.query(LFGPost).filter(LFGPost.user_id == user_id).count() == 1
+    finally:
+        check.close()
+
+
+def test_reads_do_not_wait_for_a_writer(client, make_user, make_game_profile):
+    user_id, headers = make_user()
+    make_game_profile(user_id, "Valorant")
+    cleanup = SessionLocal()
+    cleanup.query(Job).filter(Job.status.in_(("queued", "running"))).update({"status": "failed"}, synchronize_session=False)
+    cleanup.commit()
+    cleanup.close()
+
+    writer = SessionLocal()
+    writer.execute(update(User).where(User.id == user_id).values(platform="PC"))  # holds the write lock
+    try:
+        for path in ("/auth/me", "/user/profile", "/profiles", "/profiles/Valorant"):
+            assert client.get(path, headers=headers).status_code == 200, path
+        # An idle job poll only reads
+        poller = SessionLocal()
+        try:
+            assert claim_next_job(poller) is None
+        finally:
+            poller.close()
+        writer.commit()
+    finally:
+        writer.close()
+
+
+def test_concurrent_clients_lose_no_writes(make_user):
+    users = [make_user() for _ in range(CLIENTS)]
+
+    def session(user):
+        _, headers = user
+        client = TestClient(api)
+        statuses = []
+        for i in range(WRITES_PER_CLIENT):
+            statuses.append(client.post("/lfg", json={"content": f"post {i}", "game": "Valorant"}, headers=headers).status_code)
+            statuses.append(client.put("/user/profile/edit", json={"platform": "PC", "region": "EU", "games": [str(i)]},
+                                       headers=headers).status_code)
+            statuses.append(client.get("/dashboard/stats", headers=headers).status_code)
+        return statuses
+
+    with ThreadPoolExecutor(max_workers=CLIENTS) as pool:
+        statuses = [code for result in pool.map(session, users) for code in result]
+    assert not [code for code in statuses if code >= 500]
+
+    ids = [user_id for user_id, _ in users]
+    db = SessionLocal()
+    try:
+        posts = db.query(func.count(LFGPost.id)).filter(LFGPost.user_id.in_(ids)).scalar()
+        versions = {version for (version,) in db.query(User.version).filter(User.id.in_(ids))}
+    finally:
+        db.close()
+    assert posts == CLIENTS * WRITES_PER_CLIENT
+    assert versions == {1 + WRITES_PER_CLIENT}